@@ -1,16 +1,19 @@
 # -*- coding: utf-8 -*-
 # /usr/bin/env python3
 
-from typing import Generator, Optional, Any
+import hashlib
+import time
+from typing import Annotated, Generator, Optional, Any, Tuple
 
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from jose import jwt, JWTError
+from sqlalchemy.orm import make_transient_to_detached
 
-from app import crud, models, schemas
+from app import crud, models
 from app.core import security
-from app.core.config import settings
+from app.core.config import settings, get_settings, Settings
 from app.db.session import get_async_session
 
 # 中文: 定义 OAuth2 密码 Bearer 模式, 指定获取令牌的 URL (稍后创建)
@@ -19,6 +22,42 @@ reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
 )
 
+# 中文: 已验证令牌缓存 (令牌摘要 -> (用户 ID, 过期时间戳)), 命中时跳过 JWT 签名验证
+# English: Verified token cache (token digest -> (user ID, expiry timestamp)), skips JWT signature verification on hit
+_token_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+
+# 中文: 用户快照缓存 (用户 ID -> 游离的 User 对象), TTL 较短, 命中时跳过数据库查询
+# English: User snapshot cache (user ID -> detached User object), short TTL, skips the DB fetch on hit
+_user_cache: TTLCache = TTLCache(maxsize=1_000, ttl=10)
+
+def _token_key(token: str) -> bytes:
+    """
+    中文: 计算令牌的缓存键, 避免在内存中保存原始令牌。
+    English: Compute the cache key for a token, avoiding keeping the raw token in memory.
+    """
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+def _get_cached_token(token: str) -> Optional[Tuple[int, float]]:
+    """
+    中文: 从缓存中获取令牌信息, 如果令牌已过期则将其移除。
+    English: Get token info from the cache, evicting it if the token has expired.
+    """
+    key = _token_key(token)
+    entry = _token_cache.get(key)
+    if entry is None:
+        return None
+    if entry[1] <= time.time():
+        _token_cache.pop(key, None)
+        return None
+    return entry
+
+def invalidate_user_cache(user_id: int) -> None:
+    """
+    中文: 使指定用户的缓存快照失效 (例如在修改密码或用户状态后调用)。
+    English: Invalidate the cached snapshot of a user (e.g. after a password or status change).
+    """
+    _user_cache.pop(user_id, None)
+
 async def get_current_user(
     db: AsyncSession = Depends(get_async_session), token: str = Depends(reusable_oauth2)
 ) -> models.User:
@@ -35,26 +74,36 @@ async def get_current_user(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = security.decode_token(token)
+    cached_token = _get_cached_token(token)
+    if cached_token is not None:
+        user_id = cached_token[0]
+    else:
+        payload = security.decode_token_payload(token)
         if payload is None:
             raise credentials_exception
-        token_data = schemas.TokenPayload(sub=payload)
-    except JWTError:
-        raise credentials_exception
 
-    # 中文: 假设 subject (sub) 是用户 ID
-    # English: Assume subject (sub) is the user ID
-    try:
-        user_id = int(token_data.sub)
-    except (ValueError, TypeError):
-         # 如果 sub 不是有效的整数 ID, 抛出异常
-         # If sub is not a valid integer ID, raise exception
-         raise credentials_exception
+        # 中文: 假设 subject (sub) 是用户 ID; 直接转换为整数, 无需再经过 Pydantic 模型校验
+        # English: Assume subject (sub) is the user ID; convert it to int directly, no Pydantic model validation needed
+        try:
+            user_id = int(payload["sub"])
+        except (ValueError, TypeError):
+             # 如果 sub 不是有效的整数 ID, 抛出异常
+             # If sub is not a valid integer ID, raise exception
+             raise credentials_exception
+        _token_cache[_token_key(token)] = (user_id, float(payload.get("exp", 0)))
+
+    # 中文: 将缓存的快照合并进当前会话 (load=False 不发出 SQL), 每个请求获得独立的实例
+    # English: Merge the cached snapshot into the current session (load=False emits no SQL), each request gets its own instance
+    snapshot = _user_cache.get(user_id)
+    if snapshot is not None:
+        return await db.merge(snapshot, load=False)
 
     user = await crud.user.get(db, id=user_id)
     if not user:
         raise credentials_exception
+    snapshot = models.User(**user.model_dump())
+    make_transient_to_detached(snapshot)
+    _user_cache[user_id] = snapshot
     return user
 
 async def get_current_active_user(
@@ -80,3 +129,10 @@ async def get_current_active_superuser(
             status_code=403, detail="The user doesn't have enough privileges"
         )
     return current_user
+
+# 中文: 可复用的依赖类型别名, 端点通过类型注解声明依赖, 无需在每个参数上重复 Depends(...)
+# English: Reusable dependency type aliases, endpoints declare dependencies through annotations instead of repeating Depends(...) on every parameter
+SessionDep = Annotated[AsyncSession, Depends(get_async_session)]
+CurrentUser = Annotated[models.User, Depends(get_current_active_user)]
+CurrentSuperuser = Annotated[models.User, Depends(get_current_active_superuser)]
+SettingsDep = Annotated[Settings, Depends(get_settings)]
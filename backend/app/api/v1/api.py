@@ -1,25 +1,30 @@
 # -*- coding: utf-8 -*-
 # /usr/bin/env python3
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
+from app.api import deps
 from app.api.v1.endpoints import links, history, database, login, password_reset, users, settings # 导入 settings 路由 / Import settings router
 
 # 中文: 创建 v1 版本的 API 路由器
 # English: Create the v1 API router
 api_router = APIRouter()
 
+# 中文: 需要已认证活动用户的路由共用的依赖, 在包含路由时注册一次, 而不是在每个端点上重复声明
+# English: Shared dependency for routers that require an authenticated active user, registered once at include time instead of on every endpoint
+active_user_dependencies = [Depends(deps.get_current_active_user)]
+
 # 中文: 包含 links 路由, 并添加前缀和标签
 # English: Include the links router, adding a prefix and tags
-api_router.include_router(links.router, prefix="/links", tags=["Links"])
+api_router.include_router(links.router, prefix="/links", tags=["Links"], dependencies=active_user_dependencies)
 
 # 中文: 包含 history 路由, 并添加前缀和标签
 # English: Include the history router, adding a prefix and tags
-api_router.include_router(history.router, prefix="/history", tags=["History"])
+api_router.include_router(history.router, prefix="/history", tags=["History"], dependencies=active_user_dependencies)
 
 # 中文: 包含 database 路由, 并添加前缀和标签
 # English: Include the database router, adding a prefix and tags
-api_router.include_router(database.router, prefix="/database", tags=["Database"])
+api_router.include_router(database.router, prefix="/database", tags=["Database"], dependencies=active_user_dependencies)
 
 # 中文: 包含 login 路由, 并添加标签
 # English: Include the login router, adding tags
@@ -2,22 +2,21 @@
 # /usr/bin/env python3
 
 import os
+import asyncio
 import logging
 import tempfile
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, UploadFile, File, BackgroundTasks, Depends # 导入 Depends / Import Depends
-from fastapi.responses import FileResponse
-from starlette.background import BackgroundTask # 导入 BackgroundTask / Import BackgroundTask
+from fastapi import APIRouter, HTTPException, UploadFile, File, BackgroundTasks
+from fastapi.responses import StreamingResponse
 
-from app.utils import export_database_to_sql, import_database_from_sql
+from app.utils import import_database_from_sql, stream_database_dump
 from app.core.config import settings
-from app.api import deps # 导入认证依赖 / Import authentication dependencies
-from app import models # 导入 models / Import models
 
 logger = logging.getLogger(__name__)
+# 认证依赖 (get_current_active_user) 在 api.py 中包含路由时统一注册 / Auth dependency (get_current_active_user) is registered once when the router is included in api.py
 router = APIRouter()
 
-@router.get("/export", response_class=FileResponse, dependencies=[Depends(deps.get_current_active_user)])
+@router.get("/export", response_class=StreamingResponse)
 async def export_db(
     # current_user: models.User = Depends(deps.get_current_active_user) # 获取当前用户 (如果需要记录操作者) / Get current user (if operator logging is needed)
 ):
@@ -25,32 +24,24 @@ async def export_db(
     中文: 导出整个数据库为 SQL 文件并提供下载。
     English: Export the entire database as an SQL file and provide it for download.
     """
-    # 中文: 创建一个临时文件来存储导出的 SQL
-    # English: Create a temporary file to store the exported SQL
-    # 使用 NamedTemporaryFile 并在 FileResponse 中处理删除可能更优雅
-    # Using NamedTemporaryFile and handling deletion in FileResponse might be more elegant
+    # 中文: 将 sqlite3 .dump 的输出直接流式写入响应, 不再写入临时文件后再读回
+    # English: Stream the sqlite3 .dump output straight into the response instead of writing a temp file and reading it back
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    temp_dir = tempfile.gettempdir()
-    export_filename = os.path.join(temp_dir, f"media_auto_saver_backup_{timestamp}.sql")
+    filename = f"media_auto_saver_backup_{timestamp}.sql"
 
-    logger.info(f"Attempting database export to temporary file: {export_filename}")
-    success = await export_database_to_sql(export_filename)
+    logger.info(f"Streaming database export as: {filename}")
+    dump = await stream_database_dump()
 
-    if not success:
+    if dump is None:
         raise HTTPException(status_code=500, detail="Database export failed.")
 
-    # 中文: 使用 FileResponse 发送文件, FastAPI 会在发送后自动清理临时文件 (如果使用 BackgroundTasks)
-    # English: Use FileResponse to send the file, FastAPI handles cleanup if using BackgroundTasks for deletion
-    # 中文: 使用 FileResponse 发送文件, 并添加后台任务删除临时文件
-    # English: Use FileResponse to send the file, and add a background task to delete the temporary file
-    return FileResponse(
-        path=export_filename,
-        filename=f"media_auto_saver_backup_{timestamp}.sql",
+    return StreamingResponse(
+        dump,
         media_type='application/sql',
-        background=BackgroundTask(os.remove, export_filename) # 添加后台任务删除文件 / Add background task to delete file
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
     )
 
-@router.post("/import", dependencies=[Depends(deps.get_current_active_user)])
+@router.post("/import")
 async def import_db(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="上传 SQL 文件进行导入 / Upload SQL file for import"),
@@ -72,10 +63,9 @@ async def import_db(
         # Use mkstemp to get a secure filename and file descriptor
         fd, temp_filepath = tempfile.mkstemp(suffix=".sql")
         with os.fdopen(fd, "wb") as temp_file:
-            # 分块读取上传的文件内容并写入临时文件
-            # Read uploaded file content in chunks and write to temp file
-            while content := await file.read(1024 * 1024): # Read 1MB chunks
-                temp_file.write(content)
+            # 在线程中复制上传内容, 避免阻塞事件循环
+            # Copy the upload in a worker thread to keep the event loop free
+            await asyncio.to_thread(copy_upload_to_file, file.file, temp_file)
         logger.info(f"Uploaded SQL file saved temporarily to: {temp_filepath}")
     except Exception as e:
         logger.error(f"Failed to save uploaded file: {e}", exc_info=True)
@@ -91,6 +81,40 @@ async def import_db(
                      "The application might restart or become temporarily unavailable. "
                      "Please check server logs for status."}
 
+def copy_upload_to_file(src, dst) -> None:
+    """
+    中文: 将上传的文件内容复制到目标文件。
+    English: Copy the uploaded file content into the destination file.
+
+    如果上传已落盘 (拥有真实的文件描述符), 使用 os.sendfile 在内核中直接复制, 不经过用户空间;
+    否则 (仍在内存中或平台不支持) 回退到使用可复用缓冲区的 readinto 循环。
+    If the upload has been spooled to disk (has a real file descriptor), use os.sendfile to copy
+    inside the kernel without a userspace bounce; otherwise (still in memory, or unsupported platform)
+    fall back to a readinto loop over a reusable buffer.
+    """
+    # 中文: SpooledTemporaryFile 在内存中时调用 fileno() 会强制落盘, 因此先检查是否已落盘
+    # English: Calling fileno() on an in-memory SpooledTemporaryFile forces a rollover, so check first
+    if hasattr(os, "sendfile") and getattr(src, "_rolled", True):
+        try:
+            src_fd = src.fileno()
+            offset = src.tell()
+            dst.flush()
+            while sent := os.sendfile(dst.fileno(), src_fd, offset, 1024 * 1024 * 1024):
+                offset += sent
+            return
+        except (OSError, AttributeError, ValueError):
+            # 中文: 不支持文件到文件的 sendfile (例如 macOS), 从头回退到普通复制
+            # English: File-to-file sendfile unsupported (e.g. macOS), fall back to a regular copy from the start
+            src.seek(0)
+            dst.seek(0)
+            dst.truncate()
+    # 中文: 复用同一个缓冲区, 避免每个分块都分配新的 bytes 对象
+    # English: Reuse a single buffer instead of allocating a new bytes object per chunk
+    buffer = bytearray(settings.UPLOAD_CHUNK_SIZE)
+    view = memoryview(buffer)
+    while read := src.readinto(buffer):
+        dst.write(view[:read])
+
 async def run_import_and_cleanup(temp_filepath: str):
     """
     中文: 执行数据库导入并清理临时文件的后台任务。
@@ -2,15 +2,17 @@
 # /usr/bin/env python3
 
 import logging # 导入 logging / Import logging
-from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query, Response
 from sqlmodel import select # 导入 select / Import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import tuple_
 from typing import List, Optional, Any
+from pydantic import TypeAdapter
 
-from app import crud, models # 导入 models / Import models
-from app.models.history import HistoryLog, HistoryLogRead # 导入 HistoryLog 模型 / Import HistoryLog model
-from app.db.session import get_async_session
+from app import crud
+from app.models.history import HistoryLog, HistoryLogRead, HistoryStatus # 导入 HistoryLog 模型 / Import HistoryLog model
 from app.api import deps # 导入认证依赖 / Import authentication dependencies
+from app.utils import encode_cursor, decode_cursor, NEXT_CURSOR_HEADER, history_response_cache
 
 # 中文: 获取日志记录器
 # English: Get logger
@@ -18,52 +20,81 @@ logger = logging.getLogger(__name__)
 
 # 中文: 创建 API 路由器实例
 # English: Create an API router instance
+# 认证依赖 (get_current_active_user) 在 api.py 中包含路由时统一注册 / Auth dependency (get_current_active_user) is registered once when the router is included in api.py
 router = APIRouter()
 
-@router.get("/", response_model=List[HistoryLogRead], dependencies=[Depends(deps.get_current_active_user)])
+# 中文: 预先构建的列表适配器, 由 pydantic-core 直接将行序列化为 JSON 字节
+# English: Prebuilt list adapter, letting pydantic-core serialize rows straight to JSON bytes
+HISTORY_LIST_ADAPTER = TypeAdapter(List[HistoryLogRead])
+
+@router.get("/", response_model=List[HistoryLogRead])
 async def read_history_logs(
-    db: AsyncSession = Depends(get_async_session),
+    db: deps.SessionDep,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="分页游标 (上一页响应的 X-Next-Cursor 头), 提供时忽略 skip / Pagination cursor (the X-Next-Cursor header of the previous page), skip is ignored when provided"),
     link_id: Optional[int] = Query(None, description="按关联的链接 ID 过滤 / Filter by associated link ID"),
-    status: Optional[str] = Query(None, description="按状态过滤 (success 或 failed) / Filter by status (success or failed)") # 添加状态过滤参数 / Add status filter parameter
+    status: Optional[HistoryStatus] = Query(None, description="按状态过滤 (success 或 failure) / Filter by status (success or failure)") # 由 FastAPI 校验枚举值, 无效值返回 422 / FastAPI validates the enum, invalid values return 422
 ) -> Any:
     """
     中文: 获取历史记录列表, 支持按 link_id、status 过滤和分页。
     English: Retrieve a list of history logs, supporting filtering by link_id, status, and pagination.
+
+    如果返回的记录数等于 limit, 响应头 X-Next-Cursor 中包含下一页的游标 (基于 (timestamp, id) 的键集分页, 深分页无需扫描跳过的行)。
+    If a full page is returned, the X-Next-Cursor response header carries the cursor for the next page
+    (keyset pagination on (timestamp, id), so deep pages don't scan the skipped rows).
     """
+    # 中文: 相同查询参数在 TTL 内直接返回已序列化的响应 (新的历史记录最多延迟 TTL 秒可见)
+    # English: Identical query parameters within the TTL return the already serialized response (new logs become visible within the TTL)
+    cache_key = (skip, limit, cursor, link_id, status)
+    cached = history_response_cache.get(cache_key)
+    if cached is not None:
+        content, headers = cached
+        return Response(content=content, media_type="application/json", headers=headers)
+
     query = select(HistoryLog)
 
     # 应用过滤条件 / Apply filters
     if link_id is not None:
         query = query.where(HistoryLog.link_id == link_id)
     if status is not None:
-        # 确保状态是有效的 (虽然前端下拉框限制了, 后端也应验证)
-        # Ensure status is valid (frontend dropdown limits, but backend should also validate)
-        valid_statuses = ["success", "failed"] # 根据 HistoryLog 模型中的实际状态调整 / Adjust based on actual statuses in HistoryLog model
-        if status.lower() in valid_statuses:
-            query = query.where(HistoryLog.status == status.lower())
-        else:
-            # 可以选择忽略无效状态或返回错误 / Can choose to ignore invalid status or return error
-            # 这里选择忽略 / Choosing to ignore here
-            logger.warning(f"Received invalid status filter: {status}")
+        query = query.where(HistoryLog.status == status)
 
+    # 应用游标 (键集分页) / Apply cursor (keyset pagination)
+    if cursor:
+        try:
+            cursor_ts, cursor_id = decode_cursor(cursor)
+            cursor_ts, cursor_id = datetime.fromisoformat(cursor_ts), int(cursor_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+        query = query.where(tuple_(HistoryLog.timestamp, HistoryLog.id) < tuple_(cursor_ts, cursor_id))
 
-    # 应用排序 (按时间倒序) / Apply sorting (by time descending)
-    query = query.order_by(HistoryLog.timestamp.desc())
+    # 应用排序 (按时间倒序, id 作为同一时间的决胜键) / Apply sorting (by time descending, id breaks ties)
+    query = query.order_by(HistoryLog.timestamp.desc(), HistoryLog.id.desc())
 
     # 应用分页 / Apply pagination
-    query = query.offset(skip).limit(limit)
+    if not cursor:
+        query = query.offset(skip)
+    query = query.limit(limit)
 
     result = await db.execute(query)
     history = result.scalars().all()
 
-    return history
+    headers = {}
+    if history and len(history) == limit:
+        last = history[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(last.timestamp.isoformat(), last.id)
+
+    # 中文: 直接返回 JSON 字节, 跳过 FastAPI 的逐项转换和 json.dumps
+    # English: Return the JSON bytes directly, skipping FastAPI's per-item conversion and json.dumps
+    content = HISTORY_LIST_ADAPTER.dump_json(HISTORY_LIST_ADAPTER.validate_python(history, from_attributes=True))
+    history_response_cache[cache_key] = (content, headers)
+    return Response(content=content, media_type="application/json", headers=headers)
 
-@router.delete("/{history_id}", response_model=HistoryLogRead, dependencies=[Depends(deps.get_current_active_user)])
+@router.delete("/{history_id}", response_model=HistoryLogRead)
 async def delete_history_log(
     *,
-    db: AsyncSession = Depends(get_async_session),
+    db: deps.SessionDep,
     history_id: int,
     # current_user: models.User = Depends(deps.get_current_active_user)
 ) -> Any:
@@ -75,12 +106,13 @@ async def delete_history_log(
     if not history:
         raise HTTPException(status_code=404, detail="History log not found")
     deleted_history = await crud.history_log.remove(db=db, id=history_id)
+    history_response_cache.clear()
     return deleted_history
 
-@router.delete("/by_link/{link_id}", response_model=dict, dependencies=[Depends(deps.get_current_active_user)])
+@router.delete("/by_link/{link_id}", response_model=dict)
 async def delete_history_logs_by_link(
     *,
-    db: AsyncSession = Depends(get_async_session),
+    db: deps.SessionDep,
     link_id: int,
     # current_user: models.User = Depends(deps.get_current_active_user)
 ) -> Any:
@@ -95,4 +127,5 @@ async def delete_history_logs_by_link(
          raise HTTPException(status_code=404, detail=f"Link with id {link_id} not found")
 
     deleted_count = await crud.history_log.remove_by_link(db=db, link_id=link_id)
+    history_response_cache.clear()
     return {"message": f"Successfully deleted {deleted_count} history logs for link_id {link_id}"}
@@ -1,28 +1,52 @@
 # -*- coding: utf-8 -*-
 # /usr/bin/env python3
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
 from sqlmodel import select
-from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Any
+from pydantic import TypeAdapter
 
-from app import crud, models # 导入 models / Import models
+from app import crud
 from app.models.link import Link, LinkCreate, LinkRead, LinkUpdate, LinkType, LinkStatus
-from app.db.session import get_async_session
+from app.models.link_tag import LinkTag
 from app.core.config import settings
-from app.utils import extract_site_name
+from app.utils import extract_site_name, split_tags, encode_cursor, decode_cursor, NEXT_CURSOR_HEADER, link_response_cache, history_response_cache
 from app.api import deps # 导入认证依赖 / Import authentication dependencies
 from app.tasks.link_monitor import process_link # 导入手动触发任务函数 / Import manual trigger task function
 import asyncio # 导入 asyncio / Import asyncio
 
 # 中文: 创建 API 路由器实例
 # English: Create an API router instance
+# 认证依赖 (get_current_active_user) 在 api.py 中包含路由时统一注册 / Auth dependency (get_current_active_user) is registered once when the router is included in api.py
 router = APIRouter()
 
-@router.post("/", response_model=LinkRead, status_code=201, dependencies=[Depends(deps.get_current_active_user)])
+# 中文: limit 超过该值时使用流式结果 (服务器端游标) 按批读取, 而不是一次性物化全部行
+# English: Above this limit, rows are read in batches from a streamed result (server-side cursor) instead of materializing them all at once
+STREAM_RESULTS_THRESHOLD = 500
+STREAM_YIELD_PER = 100
+
+# 中文: 预先构建的列表适配器, 由 pydantic-core 直接将行序列化为 JSON 字节
+# English: Prebuilt list adapter, letting pydantic-core serialize rows straight to JSON bytes
+LINK_LIST_ADAPTER = TypeAdapter(List[LinkRead])
+LINK_ADAPTER = TypeAdapter(LinkRead)
+
+# 中文: 限制手动触发任务的并发数, 并保存任务引用以免被垃圾回收
+# English: Bound the concurrency of manually triggered tasks, and keep task references so they aren't garbage collected
+_link_task_semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_LINK_TASKS)
+_link_tasks = set()
+
+async def _process_link_bounded(link_id: int):
+    """
+    中文: 在信号量限制下运行 process_link。
+    English: Run process_link under the concurrency semaphore.
+    """
+    async with _link_task_semaphore:
+        await process_link(link_id)
+
+@router.post("/", response_model=LinkRead, status_code=201)
 async def create_link(
     *,
-    db: AsyncSession = Depends(get_async_session),
+    db: deps.SessionDep,
     link_in: LinkCreate,
     # current_user: models.User = Depends(deps.get_current_active_user) # 获取当前用户 (如果需要与用户关联) / Get current user (if needed for association)
 ) -> Any:
@@ -46,11 +70,12 @@ async def create_link(
     link = await crud.link.create(db=db, obj_in=link_in)
     return link
 
-@router.get("/", response_model=List[LinkRead], dependencies=[Depends(deps.get_current_active_user)])
+@router.get("/", response_model=List[LinkRead])
 async def read_links(
-    db: AsyncSession = Depends(get_async_session),
+    db: deps.SessionDep,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="分页游标 (上一页响应的 X-Next-Cursor 头), 提供时忽略 skip / Pagination cursor (the X-Next-Cursor header of the previous page), skip is ignored when provided"),
     link_type: Optional[LinkType] = Query(None, description="按链接类型过滤 / Filter by link type"),
     site_name: Optional[str] = Query(None, description="按网站名称过滤 / Filter by site name"),
     status: Optional[LinkStatus] = Query(None, description="按状态过滤 (IDLE, MONITORING, DOWNLOADING, RECORDING, ERROR) / Filter by status (IDLE, MONITORING, DOWNLOADING, RECORDING, ERROR)"),
@@ -61,6 +86,9 @@ async def read_links(
     """
     中文: 获取链接列表, 支持多种过滤条件、搜索和分页。
     English: Retrieve a list of links, supporting various filters, search, and pagination.
+
+    如果返回的记录数等于 limit, 响应头 X-Next-Cursor 中包含下一页的游标 (基于 id 的键集分页)。
+    If a full page is returned, the X-Next-Cursor response header carries the cursor for the next page (keyset pagination on id).
     """
     query = select(Link)
 
@@ -73,13 +101,12 @@ async def read_links(
         query = query.where(Link.status == status)
     if is_enabled is not None:
         query = query.where(Link.is_enabled == is_enabled)
-    if tags:
-        # 中文: 简单的标签过滤 (包含任意一个)
-        # English: Simple tag filtering (contains any)
-        tag_list = [tag.strip() for tag in tags.split(',')]
-        # 使用 SQLite 的 regexp 函数进行标签过滤
-        # Use SQLite's regexp function for tag filtering
-        query = query.where(Link.tags.op('regexp')(f"({'|'.join(tag_list)})"))
+    tag_list = split_tags(tags)
+    if tag_list:
+        # 中文: 标签过滤 (包含任意一个), 通过 LinkTag 的 (tag, link_id) 索引查找, 而不是逐行正则匹配
+        # English: Tag filtering (contains any), looked up via the LinkTag (tag, link_id) index instead of a per-row regex
+        # 使用 IN 子查询而不是 JOIN + DISTINCT, 避免对宽行去重 / Use an IN subquery rather than JOIN + DISTINCT to avoid de-duplicating wide rows
+        query = query.where(Link.id.in_(select(LinkTag.link_id).where(LinkTag.tag.in_(tag_list))))
 
     # 应用搜索条件 (按名称或 URL) / Apply search condition (by name or URL)
     if search:
@@ -89,33 +116,65 @@ async def read_links(
             (Link.url.like(search_pattern))
         )
 
-    # 应用分页 / Apply pagination
-    query = query.offset(skip).limit(limit)
+    # 应用游标 (键集分页) / Apply cursor (keyset pagination)
+    if cursor:
+        try:
+            (cursor_id,) = decode_cursor(cursor)
+            cursor_id = int(cursor_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+        query = query.where(Link.id > cursor_id)
 
-    result = await db.execute(query)
-    links = result.scalars().all()
-    return links
+    # 应用排序和分页 / Apply sorting and pagination
+    query = query.order_by(Link.id)
+    if not cursor:
+        query = query.offset(skip)
+    query = query.limit(limit)
 
-@router.get("/{link_id}", response_model=LinkRead, dependencies=[Depends(deps.get_current_active_user)])
+    if limit > STREAM_RESULTS_THRESHOLD:
+        # 中文: Link 没有关系属性, 不存在 N+1 加载问题; 大页面按 yield_per 分批拉取行
+        # English: Link has no relationships, so there is no N+1 loading; large pages fetch rows in yield_per batches
+        result = await db.stream(query.execution_options(yield_per=STREAM_YIELD_PER))
+        links = [link async for link in result.scalars()]
+    else:
+        result = await db.execute(query)
+        links = result.scalars().all()
+
+    headers = {}
+    if links and len(links) == limit:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(links[-1].id)
+    # 中文: 直接返回 JSON 字节, 跳过 FastAPI 的逐项转换和 json.dumps
+    # English: Return the JSON bytes directly, skipping FastAPI's per-item conversion and json.dumps
+    content = LINK_LIST_ADAPTER.dump_json(LINK_LIST_ADAPTER.validate_python(links, from_attributes=True))
+    return Response(content=content, media_type="application/json", headers=headers)
+
+@router.get("/{link_id}", response_model=LinkRead)
 async def read_link(
     *,
-    db: AsyncSession = Depends(get_async_session),
+    db: deps.SessionDep,
     link_id: int,
     # current_user: models.User = Depends(deps.get_current_active_user)
 ) -> Any:
     """
     中文: 通过 ID 获取单个链接。
     English: Get a single link by ID.
+
+    序列化后的响应会被短暂缓存 (后台任务更新的状态最多延迟 TTL 秒可见)。
+    The serialized response is cached briefly (status changes made by background tasks become visible within the TTL).
     """
-    link = await crud.link.get(db=db, id=link_id)
-    if not link:
-        raise HTTPException(status_code=404, detail="Link not found")
-    return link
+    content = link_response_cache.get(link_id)
+    if content is None:
+        link = await crud.link.get(db=db, id=link_id)
+        if not link:
+            raise HTTPException(status_code=404, detail="Link not found")
+        content = LINK_ADAPTER.dump_json(LINK_ADAPTER.validate_python(link, from_attributes=True))
+        link_response_cache[link_id] = content
+    return Response(content=content, media_type="application/json")
 
-@router.put("/{link_id}", response_model=LinkRead, dependencies=[Depends(deps.get_current_active_user)])
+@router.put("/{link_id}", response_model=LinkRead)
 async def update_link(
     *,
-    db: AsyncSession = Depends(get_async_session),
+    db: deps.SessionDep,
     link_id: int,
     link_in: LinkUpdate,
     # current_user: models.User = Depends(deps.get_current_active_user)
@@ -124,56 +183,52 @@ async def update_link(
     中文: 更新一个链接。
     English: Update a link.
     """
-    link = await crud.link.get(db=db, id=link_id)
-    if not link:
-        raise HTTPException(status_code=404, detail="Link not found")
+    update_data = {field: getattr(link_in, field) for field in link_in.model_fields_set}
 
-    # 中文: 如果 URL 被更新, 检查新 URL 是否已存在
-    # English: If the URL is updated, check if the new URL already exists
-    if link_in.url and link_in.url != link.url:
+    # 中文: 如果 URL 被更新, 检查新 URL 是否已被其他链接使用
+    # English: If the URL is updated, check if the new URL is already used by another link
+    if link_in.url:
         existing_link = await crud.link.get_by_url(db=db, url=link_in.url)
         if existing_link and existing_link.id != link_id:
             raise HTTPException(status_code=400, detail="Link with this new URL already exists")
         # 中文: 如果 URL 更新, 重新提取网站名称
         # English: If URL is updated, re-extract site name
-        link_in_dict = link_in.model_dump(exclude_unset=True)
-        link_in_dict["site_name"] = extract_site_name(link_in.url)
-        link = await crud.link.update(db=db, db_obj=link, obj_in=link_in_dict)
-    else:
-        link = await crud.link.update(db=db, db_obj=link, obj_in=link_in)
+        update_data["site_name"] = extract_site_name(link_in.url)
 
+    # 中文: 一条 UPDATE ... RETURNING 完成更新并取回结果, 无需先查询链接
+    # English: One UPDATE ... RETURNING performs the update and returns the row, without fetching the link first
+    link = await crud.link.update_by_id(db=db, id=link_id, obj_in=update_data)
+    if not link:
+        raise HTTPException(status_code=404, detail="Link not found")
+
+    link_response_cache.pop(link_id, None)
     return link
 
-@router.delete("/{link_id}", response_model=LinkRead, dependencies=[Depends(deps.get_current_active_user)])
+@router.delete("/{link_id}", response_model=LinkRead)
 async def delete_link(
     *,
-    db: AsyncSession = Depends(get_async_session),
+    db: deps.SessionDep,
     link_id: int,
     # current_user: models.User = Depends(deps.get_current_active_user)
 ) -> Any:
     """
-    中文: 删除一个链接。
-    English: Delete a link.
+    中文: 删除一个链接及其关联的历史记录。
+    English: Delete a link together with its associated history logs.
     """
-    link = await crud.link.get(db=db, id=link_id)
-    if not link:
-        raise HTTPException(status_code=404, detail="Link not found")
-
-    # 中文: 删除关联的历史记录
-    # English: Delete associated history logs
-    deleted_history_count = await crud.history_log.remove_by_link(db=db, link_id=link_id)
-    print(f"Deleted {deleted_history_count} history logs for link {link_id}") # Optional: log the count
-
-    # 中文: 删除链接本身
-    # English: Delete the link itself
+    # 中文: 在同一个事务中删除关联的历史记录和链接本身
+    # English: Delete the associated history logs and the link itself in a single transaction
     deleted_link = await crud.link.remove(db=db, id=link_id)
+    if not deleted_link:
+        raise HTTPException(status_code=404, detail="Link not found")
+    link_response_cache.pop(link_id, None)
+    history_response_cache.clear()
 
     return deleted_link # 返回被删除的对象 / Return the deleted object
 
-@router.post("/{link_id}/trigger", dependencies=[Depends(deps.get_current_active_user)])
+@router.post("/{link_id}/trigger")
 async def trigger_link_task(
     *,
-    db: AsyncSession = Depends(get_async_session),
+    db: deps.SessionDep,
     link_id: int,
     # current_user: models.User = Depends(deps.get_current_active_user)
 ) -> Any:
@@ -181,19 +236,21 @@ async def trigger_link_task(
     中文: 手动触发单个链接的监控/下载任务。
     English: Manually trigger the monitoring/download task for a single link.
     """
-    link = await crud.link.get(db=db, id=link_id)
-    if not link:
-        raise HTTPException(status_code=404, detail="Link not found")
-
-    # 检查链接是否已在处理中 / Check if the link is already being processed
-    if link.status in [models.link.LinkStatus.MONITORING, models.link.LinkStatus.DOWNLOADING, models.link.LinkStatus.RECORDING]:
-         raise HTTPException(status_code=400, detail=f"Link {link_id} is already in status: {link.status}. Cannot trigger manually.")
+    # 中文: 在一条 UPDATE 中检查并占用链接, 避免检查与任务启动之间的竞争
+    # English: Check and claim the link in a single UPDATE, avoiding a race between the check and the task start
+    if not await crud.link.claim_for_processing(db=db, id=link_id):
+        link = await crud.link.get(db=db, id=link_id)
+        if not link:
+            raise HTTPException(status_code=404, detail="Link not found")
+        if not link.is_enabled:
+            raise HTTPException(status_code=400, detail=f"Link {link_id} is disabled. Cannot trigger manually.")
+        raise HTTPException(status_code=400, detail=f"Link {link_id} is already in status: {link.status}. Cannot trigger manually.")
 
-    # 可以在这里选择性地将状态设置为 'queued' 或其他中间状态
-    # Optionally set status to 'queued' or another intermediate status here
-    # await crud.link.update_status(db=db, db_obj=link, status=models.link.LinkStatus.QUEUED)
+    link_response_cache.pop(link_id, None)
 
     # 在后台启动任务 / Start the task in the background
-    asyncio.create_task(process_link(link_id))
+    task = asyncio.create_task(_process_link_bounded(link_id))
+    _link_tasks.add(task)
+    task.add_done_callback(_link_tasks.discard)
 
     return {"message": f"Task triggered for link {link_id}"}
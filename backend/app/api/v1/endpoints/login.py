@@ -6,7 +6,6 @@ from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, status, Form # 导入 status 和 Form / Import status and Form
 # from fastapi.security import OAuth2PasswordRequestForm # 不再使用 / No longer used
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, models, schemas
 from app.api import deps
@@ -17,7 +16,7 @@ router = APIRouter()
 
 @router.post("/login/access-token", response_model=schemas.Token)
 async def login_access_token(
-    db: AsyncSession = Depends(deps.get_async_session),
+    db: deps.SessionDep,
     username: str = Form(...), # 直接接收表单字段 / Receive form fields directly
     password: str = Form(...)
 ) -> Any:
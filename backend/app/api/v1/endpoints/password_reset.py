@@ -5,11 +5,10 @@ import logging
 from typing import Any, Optional
 from datetime import datetime # 导入 datetime / Import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Body, Query, status
+from fastapi import APIRouter, HTTPException, Body, Query, status
 from pydantic import BaseModel, EmailStr, Field
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from app import crud, models
+from app import crud
 from app.api import deps
 from app.core.config import settings
 from app.core import security # 导入 security 模块 / Import security module
@@ -31,7 +30,7 @@ class GenerateResetTokenResponse(BaseModel):
 @router.post("/password-recovery/{username}", response_model=GenerateResetTokenResponse, status_code=status.HTTP_201_CREATED)
 async def recover_password_generate_token(
     username: str,
-    db: AsyncSession = Depends(deps.get_async_session),
+    db: deps.SessionDep,
     # current_user: models.User = Depends(deps.get_current_active_superuser) # 限制只有管理员能生成令牌 / Restrict token generation to superusers
 ) -> Any:
     """
@@ -52,14 +51,15 @@ async def recover_password_generate_token(
 
     # 中文: 创建并存储重置令牌
     # English: Create and store the reset token
-    reset_token_obj = await crud.password_reset_token.create_reset_token(db, user_id=user.id)
-    logger.info(f"Password reset token generated for user {username}: {reset_token_obj.token}")
+    # 中文: 响应只用到客户端生成的 expires_at, 无需 refresh / English: The response only uses the client-generated expires_at, so no refresh is needed
+    reset_token, reset_token_obj = await crud.password_reset_token.create_reset_token(db, user_id=user.id, refresh=False)
+    logger.info(f"Password reset token generated for user {username}")
 
     # 中文: 返回令牌信息 (在实际应用中, 不应直接返回令牌, 而是通过其他方式传递)
     # English: Return token info (in real apps, token shouldn't be returned directly, but delivered otherwise)
     return GenerateResetTokenResponse(
         username=user.username,
-        reset_token=reset_token_obj.token,
+        reset_token=reset_token,
         expires_at=reset_token_obj.expires_at
     )
 
@@ -67,45 +67,39 @@ async def recover_password_generate_token(
 @router.post("/reset-password/", status_code=status.HTTP_200_OK)
 async def reset_password(
     *,
-    db: AsyncSession = Depends(deps.get_async_session),
+    db: deps.SessionDep,
     body: ResetPasswordRequest = Body(...)
 ) -> Any:
     """
     中文: 使用有效的重置令牌重置密码。
     English: Reset password using a valid reset token.
     """
-    token = body.token
-    new_password = body.new_password
-
-    # 中文: 查找令牌
-    # English: Find the token
-    token_obj = await crud.password_reset_token.get_by_token(db, token=token)
-    if not token_obj:
-        raise HTTPException(status_code=400, detail="Invalid password reset token")
-
-    # 中文: 验证令牌是否有效 (未过期且未使用)
-    # English: Validate the token (not expired and not used)
-    if not crud.password_reset_token.is_token_valid(token_obj):
-         raise HTTPException(status_code=400, detail="Password reset token is invalid or has expired")
-
-    # 中文: 获取关联的用户
-    # English: Get the associated user
-    user = await crud.user.get(db, id=token_obj.user_id)
-    if not user:
-        # 中文: 这种情况理论上不应发生, 但以防万一
-        # English: This shouldn't happen theoretically, but just in case
-        raise HTTPException(status_code=404, detail="User associated with token not found")
+    # 中文: 先在 SQL 中校验令牌 (未使用且未过期), 无效令牌在计算耗时的密码哈希之前就被拒绝
+    # English: Check the token in SQL first (unused and not expired), so invalid tokens are rejected before the slow password hash
+    token_obj = await crud.password_reset_token.get_by_token(db, token=body.token)
+    if token_obj is None:
+        raise HTTPException(status_code=400, detail="Password reset token is invalid or has expired")
+
+    # 中文: 在线程中计算新密码哈希, 避免在持有写事务时进行耗时计算
+    # English: Hash the new password in a thread, so the slow computation doesn't happen while holding a write transaction
+    hashed_password = await security.get_password_hash_async(body.new_password)
+
+    # 中文: 条件消费令牌; 并发请求中只有一个能成功, 其余返回 400
+    # English: Consume the token conditionally; only one of several concurrent requests succeeds, the rest get 400
+    user_id = await crud.password_reset_token.consume_token(db, token=body.token)
+    if user_id is None:
+        raise HTTPException(status_code=400, detail="Password reset token is invalid or has expired")
 
     # 中文: 更新用户密码
     # English: Update user password
-    hashed_password = security.get_password_hash(new_password)
-    user.hashed_password = hashed_password
-    db.add(user)
-
-    # 中文: 将令牌标记为已使用
-    # English: Mark the token as used
-    await crud.password_reset_token.use_token(db, token_obj=token_obj)
+    username = await crud.user.set_password_hash(db, user_id=user_id, hashed_password=hashed_password)
+    if username is None:
+        # 中文: 这种情况理论上不应发生, 但以防万一
+        # English: This shouldn't happen theoretically, but just in case
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="User associated with token not found")
 
     await db.commit()
-    logger.info(f"Password successfully reset for user {user.username}")
+    deps.invalidate_user_cache(user_id)
+    logger.info(f"Password successfully reset for user {username}")
     return {"message": "Password updated successfully"}
@@ -1,26 +1,19 @@
 # -*- coding: utf-8 -*-
 # /usr/bin/env python3
 
-import logging
-from typing import Any, Dict
-
-from fastapi import APIRouter, Depends, HTTPException, Body, status
-from pydantic import BaseModel, Field, validator
-import json
-import os
-
 import json
 import os
+import stat
 import logging
 from typing import Any, Dict
 
-from fastapi import APIRouter, Depends, HTTPException, Body, status
+from fastapi import APIRouter, Depends, HTTPException, Body, Response, status
 from pydantic import BaseModel, Field, validator
-from dotenv import dotenv_values, set_key # For reading/writing .env
 
-from app import models
 from app.api import deps
-from app.core.config import settings, PROJECT_ROOT # 导入 settings 和项目根目录 / Import settings and project root
+from app.core.config import PROJECT_ROOT # 导入项目根目录 / Import project root
+from app.utils import cookies_response_cache
+from app.core.async_env_writer import queue_env_update
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -37,8 +30,14 @@ class SiteCookiesUpdate(BaseModel):
         for site, path in v.items():
             # 路径可以是相对于项目根目录的, 也可以是绝对路径
             # Path can be relative to project root or absolute
-            full_path = path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path)
-            if not os.path.exists(full_path) or not os.path.isfile(full_path):
+            # 中文: os.path.join 遇到绝对路径时直接返回该路径 / English: os.path.join returns absolute paths unchanged
+            full_path = os.path.join(PROJECT_ROOT, path)
+            # 中文: 一次 stat 同时判断存在性和是否为普通文件 / English: A single stat checks both existence and regular-file type
+            try:
+                is_file = stat.S_ISREG(os.stat(full_path).st_mode)
+            except (OSError, ValueError):
+                is_file = False
+            if not is_file:
                 raise ValueError(f"Cookies file path does not exist or is not a file for site '{site}': {path} (resolved to: {full_path})")
         return v
 
@@ -46,7 +45,8 @@ class SiteCookiesUpdate(BaseModel):
 
 @router.get("/cookies", response_model=Dict[str, str])
 async def get_global_site_cookies(
-    current_user: models.User = Depends(deps.get_current_active_user), # 需要认证 / Requires authentication
+    current_user: deps.CurrentUser, # 需要认证 / Requires authentication
+    app_settings: deps.SettingsDep,
 ) -> Any:
     """
     中文: 获取当前的全局站点 Cookies 配置。
@@ -54,13 +54,20 @@ async def get_global_site_cookies(
     """
     # 注意: 这里直接返回 settings 中的值。更健壮的做法可能是从数据库或专用配置文件读取。
     # Note: Directly returns value from settings. More robust approach might read from DB or dedicated config file.
-    return settings.SITE_COOKIES
+    # 中文: 配置与用户无关, 所有用户共享同一个已序列化的响应
+    # English: The configuration is user-independent, so all users share one serialized response
+    content = cookies_response_cache.get("site_cookies")
+    if content is None:
+        content = json.dumps(app_settings.SITE_COOKIES, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        cookies_response_cache["site_cookies"] = content
+    return Response(content=content, media_type="application/json")
 
 @router.put("/cookies", status_code=status.HTTP_200_OK)
 async def update_global_site_cookies(
     *,
     cookies_in: SiteCookiesUpdate = Body(...),
-    current_user: models.User = Depends(deps.get_current_active_superuser), # 限制只有管理员能修改 / Restrict modification to superusers
+    current_user: deps.CurrentSuperuser, # 限制只有管理员能修改 / Restrict modification to superusers
+    app_settings: deps.SettingsDep,
 ) -> Any:
     """
     中文: 更新全局站点 Cookies 配置。
@@ -73,26 +80,18 @@ async def update_global_site_cookies(
     """
     logger.warning("Updating global site cookies in memory. This change is NOT persistent and will be lost on restart!")
     # 验证路径 (Pydantic 模型已完成) / Validate paths (done by Pydantic model)
-    settings.SITE_COOKIES = cookies_in.site_cookies
+    app_settings.SITE_COOKIES = cookies_in.site_cookies
+    cookies_response_cache.clear()
     # --- Persist changes to .env file ---
-    try:
-        # Convert the dictionary to a JSON string for storage in .env
-        cookies_json_str = json.dumps(cookies_in.site_cookies)
-
-        # Use python-dotenv's set_key to update or add the variable
-        # This handles creating the file if it doesn't exist and preserves other variables/comments
-        set_key(dotenv_path=env_path, key_to_set="SITE_COOKIES_JSON", value_to_set=cookies_json_str, quote_mode="always")
-
-        # Important: Update the in-memory settings object as well so the change is immediately reflected
-        # without needing a restart for the *current* process.
-        settings.SITE_COOKIES = cookies_in.site_cookies
-        logger.info(f"Global site cookies updated and persisted to {env_path} by user '{current_user.username}'. New config: {settings.SITE_COOKIES}")
-        return {"message": "Global site cookies updated and saved successfully."}
-    except Exception as e:
-        logger.error(f"Failed to persist site cookies to {env_path}: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to save cookies configuration to .env file: {e}"
-        )
+    # Convert the dictionary to a JSON string for storage in .env
+    # 中文: 紧凑输出且不转义非 ASCII 字符, 写入 .env 的内容更小 / English: Compact output without escaping non-ASCII, so less is written to .env
+    cookies_json_str = json.dumps(cookies_in.site_cookies, ensure_ascii=False, separators=(",", ":"))
+
+    # 中文: 交给后台写入任务, 短时间内的多次更新合并为一次 .env 写入 (内存中的配置已立即生效)
+    # English: Hand off to the background writer, coalescing bursts of updates into one .env write (the in-memory config is already in effect)
+    await queue_env_update("SITE_COOKIES_JSON", cookies_json_str)
+    logger.info(f"Global site cookies updated by user '{current_user.username}' and queued for persistence to {env_path}. New config: {app_settings.SITE_COOKIES}")
+    # 中文: 写入 .env 在后台进行, 这里只能确认已生效并已排队持久化 / English: The .env write happens in the background, so only confirm the update is applied and queued for persistence
+    return {"message": "Global site cookies updated and queued for persistence."}
 
 # TODO: 添加其他设置相关的 API 端点 / Add other settings-related API endpoints
@@ -3,9 +3,8 @@
 
 from typing import Any, List
 
-from fastapi import APIRouter, Depends, HTTPException, Body, status # 导入 Body, status / Import Body, status
+from fastapi import APIRouter, HTTPException, Body, status # 导入 Body, status / Import Body, status
 from pydantic import BaseModel, Field # 导入 BaseModel, Field / Import BaseModel, Field
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, models
 from app.api import deps
@@ -19,7 +18,7 @@ class UpdatePassword(BaseModel):
 
 @router.get("/me", response_model=models.UserRead)
 async def read_users_me(
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: deps.CurrentUser,
 ) -> Any:
     """
     中文: 获取当前用户信息。
@@ -30,19 +29,21 @@ async def read_users_me(
 @router.put("/me/password", status_code=status.HTTP_200_OK)
 async def update_password_me(
     *,
-    db: AsyncSession = Depends(deps.get_async_session),
+    db: deps.SessionDep,
     body: UpdatePassword = Body(...),
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: deps.CurrentUser,
 ) -> Any:
     """
     中文: 更新当前用户的密码。
     English: Update current user's password.
     """
     # 验证当前密码是否正确 / Verify current password
-    if not security.verify_password(body.current_password, current_user.hashed_password):
+    if not await security.verify_password_async(body.current_password, current_user.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect current password")
     # 更新密码 / Update password
-    await crud.user.update(db, db_obj=current_user, obj_in={"password": body.new_password})
+    # 中文: 不使用返回的对象, 无需 refresh / English: The returned object isn't used, so no refresh is needed
+    await crud.user.update(db, db_obj=current_user, obj_in={"password": body.new_password}, refresh=False)
+    deps.invalidate_user_cache(current_user.id)
     return {"message": "Password updated successfully"}
 
 # TODO: 添加获取用户列表 (管理员) / Add get users list (admin)
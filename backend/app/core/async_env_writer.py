@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# /usr/bin/env python3
+
+import asyncio
+import logging
+import os
+from typing import Dict, Optional
+
+from app.core.config import PROJECT_ROOT
+
+logger = logging.getLogger(__name__)
+
+# 中文: .env 文件路径 / English: Path to the .env file
+ENV_PATH = os.path.join(PROJECT_ROOT, '.env')
+
+# 中文: 合并写入前等待的时间 (秒), 期间的多次更新只写一次文件
+# English: Time (seconds) to wait before writing; multiple updates within it result in a single file write
+ENV_WRITE_DEBOUNCE_SECONDS = 0.5
+
+# 中文: 待写入的键值 (同一个键只保留最新值) / English: Pending key/values (only the latest value per key is kept)
+_pending: Dict[str, str] = {}
+_wakeup = asyncio.Event()
+_writer_task: Optional[asyncio.Task] = None
+
+def _write_env(updates: Dict[str, str]) -> None:
+    """
+    中文: 将一批键值同步写入 .env 文件 (在工作线程中运行)。
+    English: Synchronously write a batch of key/values to the .env file (runs in a worker thread).
+    """
+    # 中文: 只有写入时才需要 set_key, 延迟导入 / English: set_key is only needed when writing, so import it lazily
+    from dotenv import set_key
+    for key, value in updates.items():
+        set_key(dotenv_path=ENV_PATH, key_to_set=key, value_to_set=value, quote_mode="always")
+
+async def flush_env_updates() -> None:
+    """
+    中文: 立即将所有待写入的键值写入 .env 文件。
+    English: Write all pending key/values to the .env file immediately.
+    """
+    if not _pending:
+        return
+    updates = dict(_pending)
+    _pending.clear()
+    try:
+        await asyncio.to_thread(_write_env, updates)
+        logger.info(f"Persisted {len(updates)} setting(s) to {ENV_PATH}: {', '.join(updates)}")
+    except Exception as e:
+        logger.error(f"Failed to persist settings to {ENV_PATH}: {e}", exc_info=True)
+
+async def queue_env_update(key: str, value: str) -> None:
+    """
+    中文: 排队一个 .env 更新, 由后台写入任务合并后写入。
+    English: Queue a .env update, to be coalesced and written by the background writer.
+
+    如果后台写入任务未运行 (例如未经过 lifespan 启动), 则立即写入。
+    If the background writer is not running (e.g. the app was not started through its lifespan), the update is written immediately.
+    """
+    _pending[key] = value
+    if _writer_task is None or _writer_task.done():
+        await flush_env_updates()
+    else:
+        _wakeup.set()
+
+async def _writer_loop() -> None:
+    """
+    中文: 后台写入循环: 收到更新后等待防抖间隔, 然后一次性写入所有待写入的键值。
+    English: Background writer loop: after an update arrives, wait for the debounce interval, then write all pending key/values at once.
+    """
+    while True:
+        await _wakeup.wait()
+        await asyncio.sleep(ENV_WRITE_DEBOUNCE_SECONDS)
+        _wakeup.clear()
+        await flush_env_updates()
+
+def start_env_writer() -> None:
+    """
+    中文: 启动后台 .env 写入任务 (在应用启动时调用)。
+    English: Start the background .env writer task (called on application startup).
+    """
+    global _writer_task
+    if _writer_task is None or _writer_task.done():
+        _writer_task = asyncio.create_task(_writer_loop())
+
+async def stop_env_writer() -> None:
+    """
+    中文: 停止后台 .env 写入任务, 并写入剩余的更新 (在应用关闭时调用)。
+    English: Stop the background .env writer task and write any remaining updates (called on application shutdown).
+    """
+    global _writer_task
+    if _writer_task is not None:
+        _writer_task.cancel()
+        try:
+            await _writer_task
+        except asyncio.CancelledError:
+            pass
+        _writer_task = None
+    await flush_env_updates()
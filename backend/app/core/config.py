@@ -2,6 +2,7 @@
 # /usr/bin/env python3
 
 import os
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from typing import Optional, Dict # 导入 Dict / Import Dict
 
@@ -57,6 +58,22 @@ class Settings(BaseSettings):
 
     # 中文: 最大并发下载任务数 / Maximum number of concurrent download tasks
     MAX_CONCURRENT_DOWNLOADS: int = int(os.getenv("MAX_CONCURRENT_DOWNLOADS", "5"))
+    # 中文: 手动触发的链接任务的最大并发数 / Maximum number of concurrently running manually triggered link tasks
+    MAX_CONCURRENT_LINK_TASKS: int = int(os.getenv("MAX_CONCURRENT_LINK_TASKS", "8"))
+
+    # 中文: 数据库连接池配置 / Database connection pool settings
+    # 连接池大小和溢出上限 / Pool size and overflow limit
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "20"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    # 获取连接的超时时间 (秒) 和连接回收周期 (秒) / Checkout timeout (seconds) and connection recycle period (seconds)
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+    # 中文: 密码哈希专用线程池的线程数 / Number of threads in the dedicated password hashing pool
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+
+    # 中文: 上传文件复制时的缓冲区大小 (字节) / Buffer size (bytes) used when copying uploaded files
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", str(4 * 1024 * 1024)))
 
     # 中文: 链接监控任务运行间隔 (分钟) / Link monitoring job interval (minutes)
     # 默认值: 60 分钟 / Default: 60 minutes
@@ -69,18 +86,54 @@ class Settings(BaseSettings):
         "extra": "ignore" # 忽略 .env 文件中未在模型中定义的额外变量 / Ignore extra variables in .env not defined in the model
     }
 
-# 中文: 创建 Settings 实例, 应用启动时会加载配置
-# English: Create an instance of Settings, settings will be loaded when the application starts
-settings = Settings()
+USER_COOKIES_DIR = os.path.join(PROJECT_ROOT, USER_COOKIES_BASE_DIR_NAME)
 
-# 中文: 确保媒体根目录存在
-# English: Ensure the media root directory exists
-os.makedirs(settings.MEDIA_ROOT, exist_ok=True)
+# 中文: 应用运行时会写回 .env 的键 (例如 PUT /settings/cookies 持久化的 SITE_COOKIES_JSON); 即使存在预编译的值, 这些键也始终从 .env 读取, 避免重启后回退到构建时的值
+# English: Keys the application writes back to .env at runtime (e.g. SITE_COOKIES_JSON persisted by PUT /settings/cookies); they are always read from .env even when compiled values exist, so a restart doesn't revert them to build-time values
+RUNTIME_ENV_KEYS = ("SITE_COOKIES_JSON",)
 
-# 中文: 确保用户 Cookies 目录存在
-# English: Ensure the user cookies directory exists
-USER_COOKIES_DIR = os.path.join(PROJECT_ROOT, USER_COOKIES_BASE_DIR_NAME)
-os.makedirs(USER_COOKIES_DIR, exist_ok=True)
+# 中文: 由 scripts/compile_env.py 在构建时生成的 .env 值 (可选, 开发环境中通常不存在)
+# English: .env values generated at build time by scripts/compile_env.py (optional, usually absent in development)
+try:
+    from app.core._env_compiled import ENV as COMPILED_ENV
+except ImportError:
+    COMPILED_ENV = None
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    中文: 创建并缓存 Settings 实例 (只解析一次 .env 和环境变量), 同时确保所需目录存在。
+    English: Create and cache the Settings instance (.env and environment variables are parsed once), also ensuring the required directories exist.
+
+    也可作为 FastAPI 依赖使用, 测试中可通过 app.dependency_overrides 替换。
+    Can also be used as a FastAPI dependency, and replaced in tests via app.dependency_overrides.
+    """
+    if COMPILED_ENV is not None:
+        # 中文: 使用构建时预解析的 .env 值 (不覆盖真实的环境变量), 跳过 Settings 对 .env 文件的解析
+        # English: Use the .env values pre-parsed at build time (real environment variables still win), skipping Settings' own .env parsing
+        env_values = dict(COMPILED_ENV)
+        env_path = Settings.model_config["env_file"]
+        if os.path.isfile(env_path):
+            # 中文: 运行时可变的键以当前 .env 为准 / English: Runtime-mutable keys take their current value from .env
+            from dotenv import dotenv_values
+            env_values.update(
+                (key, value) for key, value in dotenv_values(env_path).items()
+                if key in RUNTIME_ENV_KEYS and value is not None
+            )
+        for key, value in env_values.items():
+            os.environ.setdefault(key, value)
+        loaded = Settings(_env_file=None)
+    else:
+        loaded = Settings()
+    # 中文: 确保媒体根目录和用户 Cookies 目录存在
+    # English: Ensure the media root directory and the user cookies directory exist
+    os.makedirs(loaded.MEDIA_ROOT, exist_ok=True)
+    os.makedirs(USER_COOKIES_DIR, exist_ok=True)
+    return loaded
+
+# 中文: 模块级的 settings 仍然保留, 供导入时就需要配置的模块使用 (例如创建数据库引擎)
+# English: The module-level settings is kept for modules that need configuration at import time (e.g. creating the database engine)
+settings = get_settings()
 
 
 if __name__ == "__main__":
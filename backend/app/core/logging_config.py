@@ -1,15 +1,22 @@
 # -*- coding: utf-8 -*-
 # /usr/bin/env python3
 
+import atexit
 import logging
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
+from typing import Optional
 
 # 从 app.core.config 导入 settings 实例和 PROJECT_ROOT 常量
 # Import settings instance and PROJECT_ROOT constant from app.core.config
 from app.core.config import settings, PROJECT_ROOT
 
+# 中文: 后台日志监听器, 在独立线程中格式化并写出日志记录
+# English: Background log listener, formats and writes log records on its own thread
+_log_listener: Optional[QueueListener] = None
+
 def setup_logging():
     """
     中文: 配置应用程序的日志记录。
@@ -17,7 +24,11 @@ def setup_logging():
 
     设置控制台和文件日志处理器。
     Sets up console and file log handlers.
+
+    记录器只将日志记录放入队列, 实际的格式化和 I/O 由后台线程中的 QueueListener 完成, 不阻塞事件循环。
+    Loggers only put records on a queue; the actual formatting and I/O are done by a QueueListener on a background thread, keeping it off the event loop.
     """
+    global _log_listener
     # 中文: 获取根日志记录器
     # English: Get the root logger
     root_logger = logging.getLogger()
@@ -48,7 +59,8 @@ def setup_logging():
         log_file_path,
         maxBytes=1024 * 1024 * 5, # 5 MB
         backupCount=5, # 保留 5 个备份文件 / Keep 5 backup files
-        encoding='utf-8'
+        encoding='utf-8',
+        delay=True # 中文: 首次写入时才打开文件 / English: Open the file only on the first write
     )
     file_handler.setLevel(logging.INFO) # 中文: 文件记录 INFO 及以上级别的日志 / English: File logs INFO level and above
     file_handler.setFormatter(formatter)
@@ -57,11 +69,14 @@ def setup_logging():
     # English: Clear existing handlers to avoid duplicates
     if root_logger.hasHandlers():
         root_logger.handlers.clear()
+    stop_logging()
 
-    # 中文: 添加处理器到根日志记录器
-    # English: Add handlers to the root logger
-    root_logger.addHandler(console_handler)
-    root_logger.addHandler(file_handler)
+    # 中文: 根日志记录器只挂载 QueueHandler, 控制台和文件处理器由后台监听器驱动
+    # English: The root logger only gets a QueueHandler; the console and file handlers are driven by the background listener
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root_logger.addHandler(QueueHandler(log_queue))
+    _log_listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    _log_listener.start()
 
     # 中文: 配置 uvicorn 日志记录器, 避免重复输出
     # English: Configure uvicorn loggers to avoid duplicate output
@@ -73,6 +88,20 @@ def setup_logging():
     logger = logging.getLogger(__name__)
     logger.info("Logging configured.")
 
+def stop_logging() -> None:
+    """
+    中文: 停止后台日志监听器, 写出队列中剩余的日志记录 (在应用关闭时调用)。
+    English: Stop the background log listener, writing out any records left in the queue (called on application shutdown).
+    """
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+# 中文: 进程退出时也停止监听器, 确保未经过 lifespan 关闭时队列中的日志不会丢失
+# English: Also stop the listener at process exit, so queued records aren't lost when shutdown doesn't go through the lifespan
+atexit.register(stop_logging)
+
 if __name__ == "__main__":
     # 中文: 测试日志配置
     # English: Test logging configuration
@@ -83,3 +112,4 @@ if __name__ == "__main__":
     test_logger.warning("This is a warning message.")
     test_logger.error("This is an error message.")
     test_logger.critical("This is a critical message.")
+    stop_logging()
@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 # /usr/bin/env python3
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Union, Optional
+from typing import Any, Dict, Union, Optional
 
-from jose import jwt, JWTError
+import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
@@ -12,6 +14,13 @@ from app.core.config import settings
 # 中文: 创建密码哈希上下文, 使用 bcrypt 算法
 # English: Create password hashing context using bcrypt algorithm
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# 中文: 直接绑定 bcrypt 处理器, 跳过每次调用时的哈希格式识别和方案分派 (pwd_context 保留用于将来的方案迁移)
+# English: Bind the bcrypt handler directly, skipping hash identification and scheme dispatch on every call (pwd_context is kept for future scheme migrations)
+_bcrypt_handler = pwd_context.handler("bcrypt")
+
+# 中文: 专用于密码哈希的线程池, 登录高峰时不会占满默认线程池 (文件复制等也在使用)
+# English: Dedicated thread pool for password hashing, so login bursts don't exhaust the default pool (also used for file copies etc.)
+_pwd_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="pwd-hash")
 
 # 中文: JWT 算法
 # English: JWT Algorithm
@@ -50,31 +59,57 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     中文: 验证明文密码与哈希密码是否匹配。
     English: Verify if the plain password matches the hashed password.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return _bcrypt_handler.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """
     中文: 获取密码的哈希值。
     English: Get the hash of a password.
     """
-    return pwd_context.hash(password)
+    return _bcrypt_handler.hash(password)
 
-def decode_token(token: str) -> Optional[str]:
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
     """
-    中文: 解码 JWT 令牌并获取主题 (通常是用户 ID)。
-    English: Decode JWT token and get the subject (usually user ID).
+    中文: verify_password 的异步版本, 在专用线程池中执行 bcrypt 计算, 避免阻塞事件循环。
+    English: Async version of verify_password, running the bcrypt computation in a dedicated thread pool to keep the event loop free.
+    """
+    return await asyncio.get_running_loop().run_in_executor(_pwd_executor, _bcrypt_handler.verify, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    中文: get_password_hash 的异步版本, 在专用线程池中执行 bcrypt 计算, 避免阻塞事件循环。
+    English: Async version of get_password_hash, running the bcrypt computation in a dedicated thread pool to keep the event loop free.
+    """
+    return await asyncio.get_running_loop().run_in_executor(_pwd_executor, _bcrypt_handler.hash, password)
+
+def decode_token_payload(token: str) -> Optional[Dict[str, Any]]:
+    """
+    中文: 解码并验证 JWT 令牌, 返回完整的载荷 (包含 sub 和 exp)。
+    English: Decode and verify a JWT token, returning the full payload (including sub and exp).
 
     返回 / Returns:
-        Optional[str]: 令牌的主题, 如果令牌无效或过期则返回 None / The subject of the token, or None if the token is invalid or expired.
+        Optional[Dict[str, Any]]: 令牌载荷, 如果令牌无效、过期或缺少主题则返回 None / The token payload, or None if the token is invalid, expired or has no subject.
     """
     try:
         if not settings.SECRET_KEY:
              raise ValueError("SECRET_KEY not configured in settings")
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        subject = payload.get("sub")
-        if subject is None:
+        if payload.get("sub") is None:
             return None
-        return subject
-    except JWTError:
+        return payload
+    except jwt.InvalidTokenError:
         # 中文: 令牌无效或过期 / Token is invalid or expired
         return None
+
+def decode_token(token: str) -> Optional[str]:
+    """
+    中文: 解码 JWT 令牌并获取主题 (通常是用户 ID)。
+    English: Decode JWT token and get the subject (usually user ID).
+
+    返回 / Returns:
+        Optional[str]: 令牌的主题, 如果令牌无效或过期则返回 None / The subject of the token, or None if the token is invalid or expired.
+    """
+    payload = decode_token_payload(token)
+    if payload is None:
+        return None
+    return payload["sub"]
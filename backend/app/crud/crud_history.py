@@ -2,6 +2,7 @@
 # /usr/bin/env python3
 
 from sqlmodel import select, Session, SQLModel
+from sqlalchemy import delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Type, TypeVar, Generic, Any
 from pydantic import BaseModel
@@ -30,11 +31,12 @@ class CRUDHistoryLog(CRUDBase[HistoryLog, HistoryLogCreate, BaseModel]): # 使
         status: HistoryStatus,
         downloaded_files: Optional[List[str]] = None,
         error_message: Optional[str] = None,
-        details: Optional[dict] = None
+        details: Optional[dict] = None,
+        commit: bool = True
     ) -> HistoryLog:
         """
-        中文: 创建一条新的历史记录。
-        English: Create a new history log entry.
+        中文: 创建一条新的历史记录 (commit=False 时只 flush, 由调用方统一提交)。
+        English: Create a new history log entry (only flushed when commit=False, the caller commits in one go).
         """
         log_entry = HistoryLogCreate(
             link_id=link_id,
@@ -44,7 +46,9 @@ class CRUDHistoryLog(CRUDBase[HistoryLog, HistoryLogCreate, BaseModel]): # 使
             details=details
             # timestamp 会自动生成 / timestamp will be generated automatically
         )
-        return await self.create(db=db, obj_in=log_entry)
+        # 中文: 所有字段 (包括 timestamp) 都在客户端生成, 主键由 INSERT 返回, 无需 refresh
+        # English: All fields (including timestamp) are generated client-side and the primary key comes back from the INSERT, so no refresh is needed
+        return await self.create(db=db, obj_in=log_entry, refresh=False, commit=commit)
 
     async def get_multi_by_link(
         self, db: AsyncSession, *, link_id: int, skip: int = 0, limit: int = 100
@@ -70,19 +74,16 @@ class CRUDHistoryLog(CRUDBase[HistoryLog, HistoryLogCreate, BaseModel]): # 使
         返回: 删除的记录数量。
         Returns: The number of deleted records.
         """
-        # 注意: SQLModel 目前不直接支持批量删除的 delete() 方法返回计数。
-        # Note: SQLModel currently doesn't directly support returning count from bulk delete().
-        # 我们需要先查询再删除, 或者使用 SQLAlchemy Core API。这里采用先查询。
-        # We need to query first then delete, or use SQLAlchemy Core API. Here we query first.
-
-        logs_to_delete = await self.get_multi_by_link(db=db, link_id=link_id, limit=-1) # 获取所有 / Get all
-        count = 0
-        if logs_to_delete:
-            for log in logs_to_delete:
-                await db.delete(log)
-                count += 1
-            await db.commit()
-        return count
+        # 中文: 使用 SQLAlchemy Core 的批量 DELETE, 一条语句完成, 无需先查询再逐行删除
+        # English: Use a SQLAlchemy Core bulk DELETE, done in one statement without querying and deleting row by row
+        # 中文: synchronize_session=False 跳过会话身份映射的同步 (调用方不持有这些记录对象)
+        # English: synchronize_session=False skips syncing the session's identity map (callers don't hold these log objects)
+        result = await db.execute(
+            delete(self.model).where(self.model.link_id == link_id),
+            execution_options={"synchronize_session": False},
+        )
+        await db.commit()
+        return result.rowcount
 
 # 中文: 创建 HistoryLog CRUD 操作的实例
 # English: Create an instance of the HistoryLog CRUD operations
@@ -2,19 +2,83 @@
 # /usr/bin/env python3
 
 from sqlmodel import select, Session, SQLModel
+from sqlalchemy import delete, lambda_stmt, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+import logging
 import os # Added import
-from typing import List, Optional, Type, TypeVar, Generic, Any
+import stat
+from functools import lru_cache
+from typing import AsyncIterator, List, Optional, Tuple, Type, TypeVar, Generic, Any
 from pydantic import BaseModel
 from datetime import datetime, timezone # 导入 timezone / Import timezone
 
 from app.core.config import PROJECT_ROOT # Added import
-from app.models.link import Link, LinkCreate, LinkUpdate, LinkStatus
+from app.models.link import Link, LinkCreate, LinkUpdate, LinkStatus, LinkType
+from app.models.link_tag import LinkTag
+from app.models.history import HistoryLog
+from app.utils.link_utils import split_tags
+
+# 中文: 表示链接正在被处理的状态 / English: Statuses meaning a link is currently being processed
+BUSY_LINK_STATUSES = (LinkStatus.MONITORING, LinkStatus.DOWNLOADING, LinkStatus.RECORDING)
+# 中文: 其余 (可处理的) 状态; 查询使用正向的 IN 列表, 可以直接在 status 索引上做等值查找
+# English: The remaining (processable) statuses; queries use this positive IN list, which allows equality lookups on the status index
+IDLE_LINK_STATUSES = tuple(status for status in LinkStatus if status not in BUSY_LINK_STATUSES)
+
+# 中文: 流式查询每批从游标读取的行数, 限制同时缓冲在内存中的行数
+# English: Rows fetched from the cursor per batch for streamed queries, bounding how many rows are buffered at once
+STREAM_YIELD_PER = 64
+
+logger = logging.getLogger(__name__)
 
 # 中文: 定义泛型类型变量, 用于 CRUD 操作的基类
 # English: Define generic type variables for the base CRUD class
 USER_COOKIES_BASE_DIR_NAME = "user_cookies" # Added constant
 
+def _utcnow() -> datetime:
+    """
+    中文: 返回当前 UTC 时间 (aware datetime), CRUD 中所有时间戳统一由此获取。
+    English: Return the current UTC time (aware datetime); all CRUD timestamps are taken from here.
+    """
+    return datetime.now(timezone.utc)
+
+# 中文: 用户 Cookies 根目录 (模块加载时解析一次) / English: User cookies base directory (resolved once at module load)
+_COOKIES_BASE_DIR = os.path.normpath(os.path.join(PROJECT_ROOT, USER_COOKIES_BASE_DIR_NAME))
+_COOKIES_BASE_DIR_WITH_SEP = _COOKIES_BASE_DIR + os.sep
+
+@lru_cache(maxsize=1024)
+def _normalize_cookies_path(user_path: str) -> Tuple[str, str]:
+    """
+    中文: 校验并规范化用户提供的 Cookies 路径 (纯字符串操作, 结果可缓存), 不合法时抛出 ValueError。
+    English: Validate and normalize a user-supplied cookies path (pure string operations, so results are cacheable), raising ValueError if invalid.
+
+    返回 / Returns:
+        Tuple[str, str]: (存入数据库的相对路径, 用于校验的完整路径) / (relative path stored in the DB, full path used for checks).
+    """
+    # Disallow absolute paths from user input
+    if os.path.isabs(user_path):
+        raise ValueError("cookies_path must be a relative path, not an absolute path.")
+
+    # Normalize the user-provided path (e.g., collapses ../, ./, normalizes slashes)
+    # Treat user_path as a filename or path relative to USER_COOKIES_BASE_DIR_NAME
+    normalized_filename = os.path.normpath(user_path)
+
+    # After normalization, check for attempts to go outside the intended directory
+    if normalized_filename.startswith("..") or "/../" in normalized_filename or "\\../" in normalized_filename:
+        raise ValueError("cookies_path attempts directory traversal.")
+
+    # The path stored in DB should just be the filename or relative path within the base dir
+    # e.g., "my_cookie.txt" or "subdir/my_cookie.txt"
+    full_path_to_check = os.path.normpath(os.path.join(_COOKIES_BASE_DIR, normalized_filename))
+
+    # Final security check: ensure the resolved path is actually within the cookies base dir
+    # 中文: 两边都已规范化, 前缀比较即可 (比 commonpath 拆分再拼接快得多)
+    # English: Both sides are normalized, so a prefix test suffices (much cheaper than commonpath splitting and rejoining)
+    if full_path_to_check != _COOKIES_BASE_DIR and not full_path_to_check.startswith(_COOKIES_BASE_DIR_WITH_SEP):
+        raise ValueError("cookies_path resolves outside the designated cookies directory.")
+
+    return normalized_filename, full_path_to_check
+
 ModelType = TypeVar("ModelType", bound=SQLModel)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
@@ -33,11 +97,10 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
     async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
         """
-        中文: 通过 ID 获取单个对象。
-        English: Get a single object by ID.
+        中文: 通过 ID 获取单个对象 (先查会话的身份映射, 未命中时才按主键查询数据库)。
+        English: Get a single object by ID (checks the session's identity map first, only querying the DB by primary key on a miss).
         """
-        result = await db.execute(select(self.model).where(self.model.id == id))
-        return result.scalars().first()
+        return await db.get(self.model, id)
 
     async def get_multi(
         self,
@@ -61,18 +124,44 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         result = await db.execute(query)
         return result.scalars().all()
 
-    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
+    async def _commit_or_flush(self, db: AsyncSession, *, commit: bool) -> None:
+        """
+        中文: 根据 commit 参数提交事务, 或仅 flush (由调用方稍后统一提交)。
+        English: Commit the transaction, or only flush when commit is False (the caller commits later in one go).
+        """
+        if commit:
+            await db.commit()
+        else:
+            await db.flush()
+
+    async def create(
+        self,
+        db: AsyncSession,
+        *,
+        obj_in: CreateSchemaType,
+        refresh: Optional[bool] = None,
+        commit: bool = True
+    ) -> ModelType:
         """
         中文: 创建新对象。
         English: Create a new object.
+
+        参数 / Parameters:
+            refresh: 是否重新查询对象, 默认仅在提交时进行; 所有默认值都在客户端生成时可传 False 省去一次 SELECT
+                     Whether to re-select the object, by default only when committing; pass False to save a SELECT when all defaults are client-side.
+            commit: 是否立即提交; 为 False 时只 flush, 以便多个写操作共用一次提交
+                    Whether to commit immediately; when False only flush, so several writes can share one commit.
         """
         # 中文: 使用 Pydantic 模型的 model_dump 方法将输入数据转换为字典
         # English: Use Pydantic model's model_dump method to convert input data to a dictionary
         obj_in_data = obj_in.model_dump()
         db_obj = self.model(**obj_in_data)  # type: ignore
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await self._commit_or_flush(db, commit=commit)
+        if refresh is None:
+            refresh = commit
+        if refresh:
+            await db.refresh(db_obj)
         return db_obj
 
     async def update(
@@ -80,15 +169,19 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db: AsyncSession,
         *,
         db_obj: ModelType,
-        obj_in: UpdateSchemaType | dict[str, Any]
+        obj_in: UpdateSchemaType | dict[str, Any],
+        commit: bool = True,
+        refresh: Optional[bool] = None
     ) -> ModelType:
         """
         中文: 更新现有对象.
         English: Update an existing object.
+
+        参数 / Parameters:
+            commit: 是否立即提交; 为 False 时只 flush / Whether to commit immediately; when False only flush.
+            refresh: 是否重新查询对象, 默认仅在提交时进行; 调用方不使用返回的对象时可传 False
+                     Whether to re-select the object, by default only when committing; pass False when the caller discards the returned object.
         """
-        # 中文: 将数据库对象转换为字典
-        # English: Convert the database object to a dictionary
-        obj_data = db_obj.model_dump()
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
@@ -96,23 +189,47 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             # English: Use Pydantic model's model_dump method, exclude_unset=True means only include explicitly set fields
             update_data = obj_in.model_dump(exclude_unset=True)
 
-        # 中文: 遍历更新数据, 更新数据库对象的字段
-        # English: Iterate through update data and update the database object's fields
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
+        # 中文: 只遍历更新数据 (无需将整个数据库对象转换为字典), 跳过模型中不存在的字段
+        # English: Iterate only over the update data (no need to dump the whole DB object), skipping fields the model doesn't have
+        model_fields = type(db_obj).model_fields
+        for field, value in update_data.items():
+            if field in model_fields:
+                setattr(db_obj, field, value)
 
         # 中文: 特殊处理 updated_at 字段
         # English: Special handling for the updated_at field
         if hasattr(db_obj, "updated_at"):
-             setattr(db_obj, "updated_at", datetime.now(timezone.utc)) # 使用 aware datetime / Use aware datetime
+             now = _utcnow() # 使用 aware datetime / Use aware datetime
+             setattr(db_obj, "updated_at", now)
 
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await self._commit_or_flush(db, commit=commit)
+        if refresh is None:
+            refresh = commit
+        if refresh:
+            await db.refresh(db_obj)
         return db_obj
 
-    async def remove(self, db: AsyncSession, *, id: int) -> Optional[ModelType]:
+    async def _fast_update(self, db: AsyncSession, *, db_obj: ModelType, values: dict[str, Any], commit: bool = True) -> ModelType:
+        """
+        中文: 用单条 UPDATE 语句更新对象并提交 (commit=False 时由调用方稍后提交), 不再 refresh (省去一次 SELECT 往返), 同时同步内存中的对象字段。
+        English: Update an object with a single UPDATE statement and commit (the caller commits later when commit=False), without a refresh (saving a SELECT round-trip), while syncing the in-memory object's fields.
+        """
+        await db.execute(
+            update(self.model)
+            .where(self.model.id == db_obj.id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        if commit:
+            await db.commit()
+        # 中文: 以"已提交"的方式设置属性, 不会将对象标记为脏数据, 避免再次写入
+        # English: Set attributes as committed values so the object isn't marked dirty and written again
+        for field, value in values.items():
+            set_committed_value(db_obj, field, value)
+        return db_obj
+
+    async def remove(self, db: AsyncSession, *, id: int, commit: bool = True) -> Optional[ModelType]:
         """
         中文: 通过 ID 删除对象。
         English: Remove an object by ID.
@@ -120,7 +237,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         obj = await self.get(db=db, id=id)
         if obj:
             await db.delete(obj)
-            await db.commit()
+            await self._commit_or_flush(db, commit=commit)
         return obj
 
 
@@ -134,39 +251,16 @@ class CRUDLink(CRUDBase[Link, LinkCreate, LinkUpdate]):
         if not user_path:
             return None
 
-        # Disallow absolute paths from user input
-        if os.path.isabs(user_path):
-            raise ValueError("cookies_path must be a relative path, not an absolute path.")
-
-        # Normalize the user-provided path (e.g., collapses ../, ./, normalizes slashes)
-        # Treat user_path as a filename or path relative to USER_COOKIES_BASE_DIR_NAME
-        normalized_filename = os.path.normpath(user_path)
-
-        # After normalization, check for attempts to go outside the intended directory
-        if normalized_filename.startswith("..") or "/../" in normalized_filename or "\\../" in normalized_filename:
-            raise ValueError("cookies_path attempts directory traversal.")
-        
-        # The path stored in DB should just be the filename or relative path within the base dir
-        # e.g., "my_cookie.txt" or "subdir/my_cookie.txt"
-        
-        # Construct the full path for validation
-        # Base directory for user cookies
-        cookies_base_dir = os.path.join(PROJECT_ROOT, USER_COOKIES_BASE_DIR_NAME)
-        
-        # Ensure cookies_base_dir exists (optional: create if not, but for now assume it's manually created or handled elsewhere)
-        # os.makedirs(cookies_base_dir, exist_ok=True) 
-
-        full_path_to_check = os.path.join(cookies_base_dir, normalized_filename)
-        full_path_to_check = os.path.normpath(full_path_to_check) # Normalize again after join
-
-        # Final security check: ensure the resolved path is actually within cookies_base_dir
-        if os.path.commonpath([cookies_base_dir]) != os.path.commonpath([cookies_base_dir, full_path_to_check]):
-            raise ValueError("cookies_path resolves outside the designated cookies directory.")
+        # 中文: 纯字符串的校验与规范化结果会被缓存; 文件系统检查每次都执行, 确保文件仍然存在
+        # English: The pure string validation/normalization is cached; the filesystem check runs every time so the file must still exist
+        normalized_filename, full_path_to_check = _normalize_cookies_path(user_path)
 
-        if not os.path.exists(full_path_to_check):
+        try:
+            st = os.stat(full_path_to_check)
+        except FileNotFoundError:
             raise ValueError(f"Specified cookies file does not exist at resolved path: {normalized_filename} (expected under {USER_COOKIES_BASE_DIR_NAME})")
-        
-        if not os.path.isfile(full_path_to_check):
+
+        if not stat.S_ISREG(st.st_mode):
             raise ValueError(f"Specified cookies_path is not a file: {normalized_filename}")
 
         # Return the clean, normalized filename/relative path to be stored in DB
@@ -184,6 +278,9 @@ class CRUDLink(CRUDBase[Link, LinkCreate, LinkUpdate]):
         # The rest of the original create method from CRUDBase
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
+        # 中文: 先 flush 以获得 ID, 再写入标签关联 / English: Flush first to get the ID, then write tag associations
+        await db.flush()
+        await self._replace_tags(db, link_id=db_obj.id, tags=db_obj.tags)
         await db.commit()
         await db.refresh(db_obj)
         return db_obj
@@ -210,36 +307,164 @@ class CRUDLink(CRUDBase[Link, LinkCreate, LinkUpdate]):
             # If update_data["cookies_path"] is None, it will be set to None, effectively clearing the path
 
         # The rest of the original update method from CRUDBase
-        # Convert the database object to a dictionary
-        obj_data = db_obj.model_dump() # This line was missing from the provided snippet for update, adding it back from CRUDBase
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
+        model_fields = type(db_obj).model_fields
+        for field, value in update_data.items():
+            if field in model_fields:
+                setattr(db_obj, field, value)
         if hasattr(db_obj, "updated_at"):
-            setattr(db_obj, "updated_at", datetime.now(timezone.utc))
+            setattr(db_obj, "updated_at", _utcnow())
         db.add(db_obj)
+        if "tags" in update_data:
+            await self._replace_tags(db, link_id=db_obj.id, tags=db_obj.tags)
         await db.commit()
         await db.refresh(db_obj)
         return db_obj
 
+    async def update_by_id(self, db: AsyncSession, *, id: int, obj_in: LinkUpdate | dict[str, Any]) -> Optional[Link]:
+        """
+        中文: 通过 ID 更新链接, 使用一条 UPDATE ... RETURNING 语句, 不需要先查询链接, 也不需要提交后 refresh。
+        English: Update a link by ID with a single UPDATE ... RETURNING statement, without fetching the link first or refreshing it after commit.
+
+        返回 / Returns:
+            Optional[Link]: 更新后的链接, 链接不存在时返回 None / The updated link, or None if it doesn't exist.
+        """
+        if isinstance(obj_in, dict):
+            update_data = dict(obj_in)
+        else:
+            # 中文: 只读取显式设置的字段, 等同于 model_dump(exclude_unset=True) 但无需序列化
+            # English: Read only the explicitly set fields, equivalent to model_dump(exclude_unset=True) without serializing
+            update_data = {field: getattr(obj_in, field) for field in obj_in.model_fields_set}
+
+        if update_data.get("cookies_path") is not None:
+            # 中文: 校验失败时抛出 ValueError, 由 API 层处理 / English: Raises ValueError on failure, handled by the API layer
+            update_data["cookies_path"] = self._validate_and_normalize_cookies_path(update_data["cookies_path"])
+
+        values = {field: value for field, value in update_data.items() if field in Link.model_fields}
+        values["updated_at"] = _utcnow()
+        result = await db.execute(update(Link).where(Link.id == id).values(**values).returning(Link))
+        db_obj = result.scalars().first()
+        if db_obj is None:
+            await db.rollback()
+            return None
+        if "tags" in values:
+            await self._replace_tags(db, link_id=id, tags=db_obj.tags)
+        await db.commit()
+        return db_obj
+
+    async def remove(self, db: AsyncSession, *, id: int) -> Optional[Link]:
+        """
+        中文: 在同一个事务中删除链接及其历史记录和标签关联。
+        English: Remove a link together with its history logs and tag associations in a single transaction.
+
+        使用 DELETE ... RETURNING, 不需要先查询链接; 链接不存在时回滚并返回 None。
+        Uses DELETE ... RETURNING so the link doesn't need to be fetched first; rolls back and returns None if it doesn't exist.
+        """
+        history_result = await db.execute(delete(HistoryLog).where(HistoryLog.link_id == id))
+        await db.execute(delete(LinkTag).where(LinkTag.link_id == id))
+        result = await db.execute(delete(Link).where(Link.id == id).returning(Link))
+        obj = result.scalars().first()
+        if obj is None:
+            await db.rollback()
+            return None
+        await db.commit()
+        logger.debug(f"Deleted {history_result.rowcount} history logs for link {id}")
+        return obj
+
+    async def _replace_tags(self, db: AsyncSession, *, link_id: int, tags: Optional[str]) -> None:
+        """
+        中文: 用 tags 字符串重建链接的标签关联 (不提交)。
+        English: Rebuild a link's tag associations from its tags string (does not commit).
+        """
+        await db.execute(delete(LinkTag).where(LinkTag.link_id == link_id))
+        db.add_all([LinkTag(link_id=link_id, tag=tag) for tag in split_tags(tags)])
+
+    async def backfill_tags(self, db: AsyncSession) -> int:
+        """
+        中文: 为有标签但尚无标签关联的链接补全 LinkTag 记录 (用于升级已有数据库)。
+        English: Populate LinkTag rows for links that have tags but no associations yet (for upgrading existing databases).
+
+        返回: 补全的链接数量。
+        Returns: The number of links backfilled.
+        """
+        query = select(Link.id, Link.tags).where(
+            Link.tags.is_not(None),
+            ~select(LinkTag.link_id).where(LinkTag.link_id == Link.id).exists()
+        )
+        rows = (await db.execute(query)).all()
+        for link_id, tags in rows:
+            db.add_all([LinkTag(link_id=link_id, tag=tag) for tag in split_tags(tags)])
+        if rows:
+            await db.commit()
+        return len(rows)
+
     async def get_by_url(self, db: AsyncSession, *, url: str) -> Optional[Link]:
         """
         中文: 通过 URL 获取链接。
         English: Get a link by URL.
         """
-        result = await db.execute(select(Link).where(Link.url == url))
-        return result.scalars().first()
-
-    async def get_enabled_links(self, db: AsyncSession, *, link_type: Optional[str] = None) -> List[Link]:
+        # 中文: url 列上有唯一索引, LIMIT 1 让查询在第一个匹配处停止
+        # English: url has a unique index; LIMIT 1 lets the query stop at the first match
+        result = await db.execute(lambda_stmt(lambda: select(Link).where(Link.url == url).limit(1)))
+        return result.scalar_one_or_none()
+
+    async def iter_enabled_link_ids(
+        self, db: AsyncSession, *, link_type: Optional[str] = None, exclude_busy: bool = False
+    ) -> AsyncIterator[Tuple[int, str, LinkType]]:
         """
-        中文: 获取所有启用的链接, 可选按类型过滤。
-        English: Get all enabled links, optionally filtered by type.
+        中文: 以流式方式逐行产出所有启用链接的 (id, url, link_type), 只查询这三列, 内存占用与链接数量无关。
+        English: Yield (id, url, link_type) of all enabled links from a stream, selecting only those columns, so memory use doesn't grow with the number of links.
+
+        参数 / Parameters:
+            link_type: 按链接类型过滤 (可选) / Filter by link type (optional).
+            exclude_busy: 是否排除正在处理中的链接 / Whether to exclude links that are currently being processed.
         """
-        query = select(Link).where(Link.is_enabled == True)
+        query = select(Link.id, Link.url, Link.link_type).where(Link.is_enabled == True)
         if link_type:
             query = query.where(Link.link_type == link_type)
-        result = await db.execute(query)
-        return result.scalars().all()
+        if exclude_busy:
+            query = query.where(Link.status.in_(IDLE_LINK_STATUSES))
+        result = await db.stream(query.execution_options(yield_per=STREAM_YIELD_PER))
+        async for row in result:
+            yield row
+
+    async def claim_for_processing(self, db: AsyncSession, *, id: int) -> bool:
+        """
+        中文: 原子地将启用且空闲的链接标记为 MONITORING, 以便在启动后台任务前占用它。
+        English: Atomically mark an enabled, non-busy link as MONITORING, claiming it before a background task is started.
+
+        检查和更新在同一条 UPDATE 语句中完成, 并发的触发请求中只有一个能成功。
+        The check and the update happen in a single UPDATE statement, so only one of several concurrent triggers succeeds.
+
+        返回 / Returns:
+            bool: 是否成功占用 / Whether the link was claimed.
+        """
+        result = await db.execute(
+            update(Link)
+            .where(Link.id == id, Link.is_enabled == True, Link.status.in_(IDLE_LINK_STATUSES))
+            .values(status=LinkStatus.MONITORING)
+            .returning(Link.id)
+        )
+        claimed = result.scalar_one_or_none() is not None
+        await db.commit()
+        return claimed
+
+    async def reset_busy_links(self, db: AsyncSession, *, error_message: Optional[str] = None, commit: bool = True) -> int:
+        """
+        中文: 用一条批量 UPDATE 将所有处于处理中状态的链接重置为 IDLE (例如在启动时), 不加载链接对象。
+        English: Reset every link in a processing status to IDLE with one bulk UPDATE (e.g. on startup), without loading the links.
+
+        返回 / Returns:
+            int: 被重置的链接数量 / The number of links reset.
+        """
+        now = _utcnow()
+        result = await db.execute(
+            update(Link)
+            .where(Link.status.in_(BUSY_LINK_STATUSES))
+            .values(status=LinkStatus.IDLE, error_message=error_message, last_checked_at=now, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        await self._commit_or_flush(db, commit=commit)
+        return result.rowcount
 
     async def update_status(
         self,
@@ -248,7 +473,8 @@ class CRUDLink(CRUDBase[Link, LinkCreate, LinkUpdate]):
         db_obj: Link,
         status: LinkStatus,
         error_message: Optional[str] = None,
-        is_success: bool = False # 新增参数, 指示操作是否成功 / Added parameter to indicate if the operation was successful
+        is_success: bool = False, # 新增参数, 指示操作是否成功 / Added parameter to indicate if the operation was successful
+        commit: bool = True
     ) -> Link:
         """
         中文: 更新链接的状态、错误信息和相关时间戳。
@@ -260,10 +486,13 @@ class CRUDLink(CRUDBase[Link, LinkCreate, LinkUpdate]):
             status: 新的状态 / The new status.
             error_message: 错误信息 (仅在 status 为 ERROR 时设置) / Error message (only set if status is ERROR).
             is_success: 操作是否成功完成 (用于更新 last_success_at) / Whether the operation completed successfully (for updating last_success_at).
+            commit: 是否立即提交; False 时可与其他写入合并为一次提交 / Whether to commit immediately; False lets it share one commit with other writes.
         """
+        # 中文: 只获取一次当前时间, 供所有时间戳字段使用 / English: Get the current time once and reuse it for every timestamp field
+        now = _utcnow()
         update_data = {
             "status": status,
-            "last_checked_at": datetime.now(timezone.utc) # 总是更新检查时间 / Always update check time
+            "last_checked_at": now # 总是更新检查时间 / Always update check time
         }
         if status == LinkStatus.ERROR:
             update_data["error_message"] = error_message
@@ -275,9 +504,11 @@ class CRUDLink(CRUDBase[Link, LinkCreate, LinkUpdate]):
         # 中文: 仅在显式成功时更新 last_success_at
         # English: Only update last_success_at on explicit success
         if is_success:
-            update_data["last_success_at"] = datetime.now(timezone.utc)
+            update_data["last_success_at"] = now
+
+        update_data["updated_at"] = now
 
-        return await self.update(db=db, db_obj=db_obj, obj_in=update_data)
+        return await self._fast_update(db, db_obj=db_obj, values=update_data, commit=commit)
 
 # 中文: 创建 Link CRUD 操作的实例
 # English: Create an instance of the Link CRUD operations
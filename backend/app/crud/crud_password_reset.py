@@ -2,12 +2,13 @@
 # /usr/bin/env python3
 
 from sqlmodel import select, Session, SQLModel
+from datetime import timedelta
+from sqlalchemy import delete, lambda_stmt, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
-from datetime import datetime, timezone
+from typing import Optional, Tuple
 
-from app.models.password_reset import PasswordResetToken, PasswordResetTokenCreate, generate_reset_token, calculate_expiry_date
-from .crud_link import CRUDBase # 导入通用的 CRUDBase / Import the generic CRUDBase
+from app.models.password_reset import PasswordResetToken, PasswordResetTokenCreate, generate_reset_token, hash_reset_token, calculate_expiry_date
+from .crud_link import CRUDBase, _utcnow # 导入通用的 CRUDBase / Import the generic CRUDBase
 
 class CRUDPasswordResetToken(CRUDBase[PasswordResetToken, PasswordResetTokenCreate, SQLModel]): # UpdateSchema 未使用 / UpdateSchema unused
     """
@@ -15,57 +16,109 @@ class CRUDPasswordResetToken(CRUDBase[PasswordResetToken, PasswordResetTokenCrea
     English: Specific CRUD operations for the PasswordResetToken model.
     """
 
-    async def create_reset_token(self, db: AsyncSession, *, user_id: int) -> PasswordResetToken:
+    async def create_reset_token(
+        self, db: AsyncSession, *, user_id: int, refresh: bool = True
+    ) -> Tuple[str, PasswordResetToken]:
         """
-        中文: 为用户创建并存储一个新的密码重置令牌。
-        English: Create and store a new password reset token for a user.
+        中文: 为用户创建并存储一个新的密码重置令牌 (数据库中只保存其哈希)。
+        English: Create and store a new password reset token for a user (only its hash is saved in the database).
+
+        返回 / Returns:
+            Tuple[str, PasswordResetToken]: 明文令牌和已存储的令牌对象 / The plaintext token and the stored token object.
         """
         token = generate_reset_token()
         expires_at = calculate_expiry_date()
         token_obj = PasswordResetToken(
-            token=token,
+            token_hash=hash_reset_token(token),
             user_id=user_id,
             expires_at=expires_at,
             used=False
         )
         db.add(token_obj)
         await db.commit()
-        await db.refresh(token_obj)
-        return token_obj
+        if refresh:
+            await db.refresh(token_obj)
+        return token, token_obj
 
     async def get_by_token(self, db: AsyncSession, *, token: str) -> Optional[PasswordResetToken]:
         """
-        中文: 通过令牌字符串获取令牌对象。
-        English: Get a token object by its token string.
+        中文: 通过令牌字符串获取未使用且未过期的令牌对象 (按哈希在唯一索引上查找, 有效性在 SQL 中判断)。
+        English: Get an unused, unexpired token object by its token string (looked up by hash on the unique index, validity checked in SQL).
+
+        返回 / Returns:
+            Optional[PasswordResetToken]: 令牌对象, 令牌无效、已使用或已过期时返回 None / The token object, or None if the token is invalid, used or expired.
+        """
+        token_hash = hash_reset_token(token)
+        now_utc = _utcnow()
+        result = await db.execute(lambda_stmt(lambda: select(PasswordResetToken).where(
+            PasswordResetToken.token_hash == token_hash,
+            PasswordResetToken.used == False,
+            PasswordResetToken.expires_at > now_utc,
+        ).limit(1)))
+        return result.scalar_one_or_none()
+
+    async def consume_token(self, db: AsyncSession, *, token: str) -> Optional[int]:
+        """
+        中文: 在一条 SQL 语句中校验并消费令牌 (未使用且未过期时将其标记为已使用), 不提交事务。
+        English: Validate and consume a token in a single SQL statement (marking it used if unused and not expired), without committing.
+
+        并发请求中只有一个能消费同一令牌。
+        Only one of several concurrent requests can consume the same token.
+
+        返回 / Returns:
+            Optional[int]: 令牌关联的用户 ID, 令牌无效、已使用或已过期时返回 None / The associated user ID, or None if the token is invalid, used or expired.
         """
-        result = await db.execute(select(PasswordResetToken).where(PasswordResetToken.token == token))
-        return result.scalars().first()
+        now_utc = _utcnow()
+        result = await db.execute(
+            update(PasswordResetToken)
+            .where(
+                PasswordResetToken.token_hash == hash_reset_token(token),
+                PasswordResetToken.used == False,
+                PasswordResetToken.expires_at > now_utc,
+            )
+            .values(used=True, expires_at=now_utc) # 使其立即过期 / Make it expire immediately
+            .returning(PasswordResetToken.user_id)
+        )
+        return result.scalar_one_or_none()
 
-    async def use_token(self, db: AsyncSession, *, token_obj: PasswordResetToken) -> PasswordResetToken:
+    async def use_token(
+        self, db: AsyncSession, *, token_obj: PasswordResetToken, refresh: bool = True
+    ) -> PasswordResetToken:
         """
         中文: 将令牌标记为已使用。
         English: Mark a token as used.
         """
         token_obj.used = True
-        token_obj.expires_at = datetime.now(timezone.utc) # 使其立即过期, 使用 aware datetime / Make it expire immediately, use aware datetime
+        token_obj.expires_at = _utcnow() # 使其立即过期, 使用 aware datetime / Make it expire immediately, use aware datetime
         db.add(token_obj)
         await db.commit()
-        await db.refresh(token_obj)
+        if refresh:
+            await db.refresh(token_obj)
         return token_obj
 
+    async def remove_expired(self, db: AsyncSession, *, older_than: timedelta) -> int:
+        """
+        中文: 删除过期时间早于 (现在 - older_than) 的令牌 (包括已使用的令牌, 使用时会被设为立即过期), 并提交事务。
+        English: Delete tokens that expired more than older_than ago (including used ones, which are set to expire when used), and commit.
+
+        返回 / Returns:
+            int: 删除的令牌数量 / The number of deleted tokens.
+        """
+        result = await db.execute(
+            delete(PasswordResetToken).where(PasswordResetToken.expires_at < _utcnow() - older_than),
+            execution_options={"synchronize_session": False},
+        )
+        await db.commit()
+        return result.rowcount
+
     def is_token_valid(self, token_obj: PasswordResetToken) -> bool:
         """
         中文: 检查令牌是否有效 (未过期且未使用)。
         English: Check if a token is valid (not expired and not used).
         """
-        now_utc = datetime.now(timezone.utc)
-        expires_at_aware = token_obj.expires_at
-        # 中文: 如果从数据库读取的 expires_at 是 naive 的, 附加 UTC 时区
-        # English: If expires_at read from DB is naive, make it aware (assume UTC)
-        if expires_at_aware.tzinfo is None:
-            expires_at_aware = expires_at_aware.replace(tzinfo=timezone.utc)
-
-        return not token_obj.used and expires_at_aware > now_utc
+        # 中文: expires_at 列类型 (UTCDateTime) 已保证读出的是 aware datetime; 已使用的令牌无需再比较时间
+        # English: The expires_at column type (UTCDateTime) already guarantees an aware datetime; used tokens skip the time comparison
+        return not token_obj.used and token_obj.expires_at > _utcnow()
 
 # 中文: 创建 PasswordResetToken CRUD 操作的实例
 # English: Create an instance of the PasswordResetToken CRUD operations
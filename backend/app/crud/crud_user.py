@@ -2,11 +2,12 @@
 # /usr/bin/env python3
 
 from sqlmodel import select, Session, SQLModel
+from sqlalchemy import lambda_stmt, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Type, TypeVar, Generic, Any, Dict
 
 from app.models.user import User, UserCreate, UserUpdate
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash_async, verify_password_async
 from .crud_link import CRUDBase # 导入通用的 CRUDBase / Import the generic CRUDBase
 
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
@@ -20,8 +21,10 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         中文: 通过用户名获取用户。
         English: Get a user by username.
         """
-        result = await db.execute(select(User).where(User.username == username))
-        return result.scalars().first()
+        # 中文: lambda_stmt 按 lambda 代码缓存语句构造, 每次调用只绑定新的参数
+        # English: lambda_stmt caches the statement construction per lambda code, each call only binds the new parameter
+        result = await db.execute(lambda_stmt(lambda: select(User).where(User.username == username).limit(1)))
+        return result.scalar_one_or_none()
 
     # async def get_by_email(self, db: AsyncSession, *, email: str) -> Optional[User]:
     #     """
@@ -33,19 +36,28 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
     #     result = await db.execute(select(User).where(User.email == email))
     #     return result.scalars().first()
 
-    async def create(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
+    async def create(
+        self, db: AsyncSession, *, obj_in: UserCreate, commit: bool = True, refresh: Optional[bool] = None
+    ) -> User:
         """
         中文: 创建新用户, 密码会被哈希处理。
         English: Create a new user, password will be hashed.
+
+        参数 / Parameters:
+            commit: 是否立即提交; 为 False 时只 flush / Whether to commit immediately; when False only flush.
+            refresh: 是否重新查询对象, 默认仅在提交时进行 / Whether to re-select the object, by default only when committing.
         """
-        # 中文: 使用 Pydantic 模型的 model_dump 方法将输入数据转换为字典, 排除密码
-        # English: Use Pydantic model's model_dump method to convert input data to a dictionary, excluding password
-        obj_in_data = obj_in.model_dump(exclude={"password"})
-        hashed_password = get_password_hash(obj_in.password)
+        # 中文: 直接按字段名读取属性 (排除密码), 无需经过 model_dump 的序列化
+        # English: Read attributes directly by field name (excluding password), skipping model_dump serialization
+        obj_in_data = {field: getattr(obj_in, field) for field in type(obj_in).model_fields if field != "password"}
+        hashed_password = await get_password_hash_async(obj_in.password)
         db_obj = User(**obj_in_data, hashed_password=hashed_password)
         db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        await self._commit_or_flush(db, commit=commit)
+        if refresh is None:
+            refresh = commit
+        if refresh:
+            await db.refresh(db_obj)
         return db_obj
 
     async def update(
@@ -53,7 +65,9 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         db: AsyncSession,
         *,
         db_obj: User,
-        obj_in: UserUpdate | Dict[str, Any]
+        obj_in: UserUpdate | Dict[str, Any],
+        commit: bool = True,
+        refresh: Optional[bool] = None
     ) -> User:
         """
         中文: 更新用户信息, 如果提供了新密码, 会进行哈希处理。
@@ -67,13 +81,29 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         # 中文: 如果更新数据中包含密码, 则哈希新密码
         # English: If the update data includes a password, hash the new password
         if "password" in update_data and update_data["password"]:
-            hashed_password = get_password_hash(update_data["password"])
+            hashed_password = await get_password_hash_async(update_data["password"])
             del update_data["password"] # 从更新数据中移除明文密码 / Remove plain password from update data
             update_data["hashed_password"] = hashed_password # 添加哈希后的密码 / Add hashed password
 
         # 中文: 调用基类的 update 方法处理其他字段
         # English: Call the base class's update method to handle other fields
-        return await super().update(db=db, db_obj=db_obj, obj_in=update_data)
+        return await super().update(db=db, db_obj=db_obj, obj_in=update_data, commit=commit, refresh=refresh)
+
+    async def set_password_hash(self, db: AsyncSession, *, user_id: int, hashed_password: str) -> Optional[str]:
+        """
+        中文: 直接在数据库中更新用户的密码哈希, 不加载用户对象, 不提交事务。
+        English: Update a user's password hash directly in the database without loading the user, without committing.
+
+        返回 / Returns:
+            Optional[str]: 被更新用户的用户名, 用户不存在时返回 None / The updated user's username, or None if the user does not exist.
+        """
+        result = await db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(hashed_password=hashed_password)
+            .returning(User.username)
+        )
+        return result.scalar_one_or_none()
 
     async def authenticate(
         self, db: AsyncSession, *, username: str, password: str
@@ -85,7 +115,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         user = await self.get_by_username(db=db, username=username)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             return None
         return user
 
@@ -2,22 +2,56 @@
 # /usr/bin/env python3
 
 from sqlmodel import SQLModel, create_engine, Session
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 import asyncio
 
+# 中文: 引擎参数, 根据数据库类型调整
+# English: Engine arguments, adjusted to the database backend
+engine_kwargs = {}
+if settings.DATABASE_URL.startswith("sqlite"):
+    # connect_args={"check_same_thread": False} 是 SQLite 特有的参数, 允许多个线程访问同一个连接 (FastAPI 在后台线程池中运行路由)
+    # connect_args={"check_same_thread": False} is specific to SQLite, allowing multiple threads to access the same connection (FastAPI runs routes in a background thread pool)
+    engine_kwargs["connect_args"] = {"check_same_thread": False}
+if ":memory:" not in settings.DATABASE_URL:
+    # 中文: 复用池中的连接, 避免每个请求都重新建立连接; 内存数据库使用 StaticPool, 不接受这些参数
+    # English: Reuse pooled connections instead of reconnecting per request; in-memory databases use StaticPool, which doesn't accept these arguments
+    engine_kwargs.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        # 中文: 取出连接前检测其是否可用; 本地 SQLite 文件连接不会被服务端断开, 省去每次取出时的额外查询
+        # English: Check connections are alive before checkout; local SQLite file connections can't be dropped by a server, so skip the extra query per checkout
+        pool_pre_ping=not settings.DATABASE_URL.startswith("sqlite"),
+    )
+
 # 中文: 创建异步数据库引擎
 # English: Create an asynchronous database engine
-# connect_args={"check_same_thread": False} 是 SQLite 特有的参数, 允许多个线程访问同一个连接 (FastAPI 在后台线程池中运行路由)
-# connect_args={"check_same_thread": False} is specific to SQLite, allowing multiple threads to access the same connection (FastAPI runs routes in a background thread pool)
 async_engine = create_async_engine(
     settings.DATABASE_URL,
     echo=False,  # 中文: 设置为 True 可以打印 SQL 语句 (用于调试) / English: Set to True to print SQL statements (for debugging)
     future=True, # 中文: 使用 SQLAlchemy 2.0 风格 / English: Use SQLAlchemy 2.0 style
-    connect_args={"check_same_thread": False}
+    **engine_kwargs
 )
 
+if settings.DATABASE_URL.startswith("sqlite"):
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+        """
+        中文: 为每个新的 SQLite 连接设置 PRAGMA: WAL 模式让读写互不阻塞, synchronous=NORMAL 在 WAL 下每次提交少一次 fsync, 并增大缓存。
+        English: Set PRAGMAs on each new SQLite connection: WAL lets readers and the writer proceed concurrently, synchronous=NORMAL saves an fsync per commit under WAL, plus larger caches.
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456") # 256 MB
+        cursor.execute("PRAGMA cache_size=-64000") # 约 64 MB / About 64 MB
+        cursor.close()
+
 # 中文: 创建异步会话工厂
 # English: Create an asynchronous session factory
 AsyncSessionFactory = async_sessionmaker(
@@ -45,8 +79,30 @@ async def init_db():
         # 中文: 创建所有在 SQLModel.metadata 中注册的表
         # English: Create all tables registered in SQLModel.metadata
         await conn.run_sync(SQLModel.metadata.create_all)
+        # 中文: create_all 不会为已存在的表添加新索引, 这里逐个补建 (已存在则跳过)
+        # English: create_all doesn't add new indexes to existing tables, so create them one by one here (skipping existing ones)
+        await conn.run_sync(create_missing_indexes)
     print("Database initialized.")
 
+# 中文: 模型中已不再声明、但旧数据库中可能仍存在的索引; 保留它们只会让每次写入多维护一份索引
+# English: Indexes no longer declared on the models that older databases may still have; keeping them only makes every write maintain an extra index
+OBSOLETE_INDEXES = (
+    "ix_link_status", # 由部分索引 ix_link_enabled_status 取代 / Superseded by the partial index ix_link_enabled_status
+    "ix_historylog_link_id", # 由复合索引 ix_historylog_link_id_timestamp 的前缀覆盖 / Covered by the prefix of ix_historylog_link_id_timestamp
+    "ix_historylog_timestamp", # 由复合索引 ix_historylog_timestamp_id 的前缀覆盖 / Covered by the prefix of ix_historylog_timestamp_id
+)
+
+def create_missing_indexes(sync_conn) -> None:
+    """
+    中文: 为已存在的表创建模型中声明但数据库中缺失的索引, 并删除已废弃的索引。
+    English: Create indexes declared on the models but missing from existing tables, and drop obsolete ones.
+    """
+    for index_name in OBSOLETE_INDEXES:
+        sync_conn.exec_driver_sql(f"DROP INDEX IF EXISTS {index_name}")
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
 # --- 同步引擎和会话 (如果某些操作需要同步执行, 例如 Alembic 迁移) ---
 # --- Synchronous engine and session (if some operations need synchronous execution, e.g., Alembic migrations) ---
 # sync_engine = create_engine(
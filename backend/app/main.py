@@ -7,35 +7,39 @@ import logging
 from sqlmodel import select
 from app.api.v1.api import api_router as api_v1_router # 导入 v1 路由 / Import v1 router
 from app.core.config import settings # 导入配置 / Import settings
-from app.core.logging_config import setup_logging # 导入日志配置函数 / Import logging configuration function
+from app.core.logging_config import setup_logging, stop_logging # 导入日志配置函数 / Import logging configuration functions
 from app.db.session import init_db, AsyncSessionFactory # 导入数据库初始化函数和会话工厂 / Import DB init function and session factory
+from app.core.async_env_writer import start_env_writer, stop_env_writer # 导入 .env 后台写入任务 / Import the background .env writer
 from app.tasks.scheduler import scheduler, start_scheduler, shutdown_scheduler # 导入调度器 / Import scheduler
 from app.tasks.link_monitor import trigger_monitoring_job # 导入监控任务 / Import monitoring job
-from app.models.link import Link, LinkStatus # 导入链接模型和状态 / Import Link model and status
+from app.tasks.token_cleanup import purge_expired_reset_tokens_job # 导入令牌清理任务 / Import token cleanup job
 from app import crud, models # 导入 CRUD 操作和 models / Import CRUD operations and models
 
 # 中文: 获取日志记录器 (已在 lifespan 中配置)
 # English: Get logger (configured in lifespan)
 logger = logging.getLogger(__name__)
 
-# 中文: 定义一个异步上下文管理器来处理应用的启动和关闭事件
-# English: Define an asynchronous context manager to handle application startup and shutdown events
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # 中文: 在应用启动时执行的代码
-    # English: Code to run when the application starts up
-    setup_logging() # 中文: 设置日志配置 / English: Set up logging configuration
-    logger.info("Application startup...")
-    logger.info("Initializing database...")
-    # 中文: 初始化数据库 (创建表)
-    # English: Initialize the database (create tables)
-    await init_db()
-    logger.info("Database initialized.")
-
-    # 中文: 创建初始超级用户 (如果不存在)
-    # English: Create initial superuser (if none exists)
-    logger.info("Checking for initial superuser...")
+async def _backfill_tag_associations() -> None:
+    """
+    中文: 启动任务: 为旧数据补全标签关联表。
+    English: Startup task: backfill the tag association table for existing data.
+    """
+    async with AsyncSessionFactory() as db:
+        backfilled = await crud.link.backfill_tags(db)
+        if backfilled:
+            logger.info(f"Backfilled tag associations for {backfilled} links.")
+
+async def _seed_superuser_and_reset_links() -> None:
+    """
+    中文: 启动任务: 创建初始超级用户 (如果不存在) 并重置处于中间状态的链接。
+    English: Startup task: create the initial superuser (if none exists) and reset links left in intermediate states.
+    """
+    # 中文: 初始超级用户的创建和中间状态链接的重置共用一个会话, 最后只提交一次
+    # English: Creating the initial superuser and resetting intermediate link states share one session, committed once at the end
     async with AsyncSessionFactory() as db:
+        # 中文: 创建初始超级用户 (如果不存在)
+        # English: Create initial superuser (if none exists)
+        logger.info("Checking for initial superuser...")
         # 检查是否已存在任何用户 (或特定超级用户)
         # Check if any user (or specific superuser) already exists
         query = select(models.User).where(models.User.is_superuser == True).limit(1)
@@ -67,32 +71,46 @@ async def lifespan(app: FastAPI):
                 is_active=True # 确保初始用户是激活的 / Ensure initial user is active
             )
             try:
-                await crud.user.create(db=db, obj_in=user_in)
+                # 中文: 只 flush, 与下面的重置一起提交 / English: Only flush, committed together with the reset below
+                await crud.user.create(db=db, obj_in=user_in, commit=False)
                 logger.info(f"Initial superuser '{initial_username}' created successfully.")
             except Exception as e:
                 logger.error(f"Failed to create initial superuser '{initial_username}': {e}", exc_info=True)
+                await db.rollback()
         else:
             logger.info("Superuser already exists.")
 
-
-    # 中文: 重置启动时处于中间状态的链接
-    # English: Reset links that were in an intermediate state on startup
-    logger.info("Resetting links in intermediate states...")
-    async with AsyncSessionFactory() as db:
-        intermediate_statuses = [LinkStatus.DOWNLOADING, LinkStatus.RECORDING, LinkStatus.MONITORING]
-        query = select(Link).where(Link.status.in_(intermediate_statuses))
-        links_to_reset = (await db.execute(query)).scalars().all()
-        reset_count = 0
-        for link in links_to_reset:
-            # 可以选择重置为 IDLE 或 ERROR, 这里选择 IDLE
-            # Can choose to reset to IDLE or ERROR, here we choose IDLE
-            await crud.link.update_status(db=db, db_obj=link, status=LinkStatus.IDLE, error_message="Reset on startup")
-            reset_count += 1
+        # 中文: 重置启动时处于中间状态的链接
+        # English: Reset links that were in an intermediate state on startup
+        logger.info("Resetting links in intermediate states...")
+        # 中文: 可以选择重置为 IDLE 或 ERROR, 这里选择 IDLE; 一条批量 UPDATE 完成, 无需逐个加载和提交
+        # English: Can choose to reset to IDLE or ERROR, here we choose IDLE; done in one bulk UPDATE instead of loading and committing each link
+        reset_count = await crud.link.reset_busy_links(db, error_message="Reset on startup", commit=False)
+        await db.commit()
         if reset_count > 0:
             logger.info(f"Reset {reset_count} links to IDLE status.")
         else:
             logger.info("No links found in intermediate states.")
 
+# 中文: 定义一个异步上下文管理器来处理应用的启动和关闭事件
+# English: Define an asynchronous context manager to handle application startup and shutdown events
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 中文: 在应用启动时执行的代码
+    # English: Code to run when the application starts up
+    setup_logging() # 中文: 设置日志配置 / English: Set up logging configuration
+    logger.info("Application startup...")
+    logger.info("Initializing database...")
+    # 中文: 初始化数据库 (创建表)
+    # English: Initialize the database (create tables)
+    await init_db()
+    logger.info("Database initialized.")
+
+    # 中文: 依次补全标签关联和初始化数据 (超级用户/链接状态重置); SQLite 同一时间只允许一个写事务, 并发执行没有收益且可能触发 "database is locked"
+    # English: Backfill tag associations, then seed data (superuser / link status reset); SQLite allows only one writer at a time, so running them concurrently gains nothing and can hit "database is locked"
+    await _backfill_tag_associations()
+    await _seed_superuser_and_reset_links()
+
     # 中文: 添加周期性监控任务 (例如: 每小时运行一次)
     # English: Add periodic monitoring job (e.g., run every hour)
     # 使用 settings 中配置的间隔 / Use interval configured in settings
@@ -106,10 +124,23 @@ async def lifespan(app: FastAPI):
     )
     logger.info("Scheduled monitoring job.")
 
+    # 中文: 每天清理一次过期的密码重置令牌 / English: Purge expired password reset tokens once a day
+    scheduler.add_job(
+        purge_expired_reset_tokens_job,
+        'interval',
+        days=1,
+        id='purge_expired_reset_tokens_job',
+        replace_existing=True
+    )
+
     # 中文: 启动调度器
     # English: Start the scheduler
     start_scheduler()
 
+    # 中文: 启动 .env 后台写入任务 (合并设置更新)
+    # English: Start the background .env writer (coalesces settings updates)
+    start_env_writer()
+
     yield # 应用在此处运行 / Application runs here
 
     # 中文: 在应用关闭时执行的代码
@@ -119,6 +150,12 @@ async def lifespan(app: FastAPI):
     # English: Shutdown the scheduler
     shutdown_scheduler()
     logger.info("Scheduler shut down complete.")
+    # 中文: 写入尚未持久化的设置更新
+    # English: Write any settings updates not yet persisted
+    await stop_env_writer()
+    # 中文: 停止后台日志监听器 (最后执行, 确保关闭日志被写出)
+    # English: Stop the background log listener (last, so shutdown logs are written out)
+    stop_logging()
 
 # 中文: 创建 FastAPI 应用实例, 并指定 lifespan 管理器
 # English: Create FastAPI application instance and specify the lifespan manager
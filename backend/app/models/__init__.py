@@ -3,6 +3,7 @@
 
 # 中文: 导入模型以便于访问 / English: Import models for easier access
 from .link import Link, LinkCreate, LinkRead, LinkUpdate, LinkType, LinkStatus
+from .link_tag import LinkTag
 from .history import HistoryLog, HistoryLogCreate, HistoryLogRead, HistoryStatus
 from .user import User, UserCreate, UserRead, UserUpdate
 from .password_reset import PasswordResetToken, PasswordResetTokenCreate
@@ -3,8 +3,11 @@
 
 from sqlmodel import SQLModel, Field, Column, Relationship
 from typing import Optional, List, Any, Dict # 导入 Dict / Import Dict
-from datetime import datetime, timezone
-from sqlalchemy import JSON # 使用 SQLAlchemy 的 JSON 类型 / Use SQLAlchemy's JSON type
+from datetime import datetime
+from pydantic import ConfigDict
+from sqlalchemy import Index
+
+from .types import JSONVariant, utcnow # JSON 列类型 (PostgreSQL 上为 JSONB) 和时间戳默认值 / JSON column type (JSONB on PostgreSQL) and timestamp default
 import enum
 
 # 中文: 导入 Link 模型用于建立关系 (如果需要)
@@ -24,15 +27,17 @@ class HistoryLogBase(SQLModel):
     中文: 历史记录模型的基础字段
     English: Base fields for the HistoryLog model
     """
-    link_id: int = Field(foreign_key="link.id", index=True, description="关联的链接 ID / Associated Link ID")
-    # 中文: 使用 timezone.utc 确保时间戳是 aware 的 / Use timezone.utc to ensure timestamp is aware
-    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), index=True, description="事件发生时间 / Event timestamp")
+    # 中文: 不单独建索引, 由复合索引 (link_id, timestamp) 的前缀覆盖 / English: No standalone index, covered by the prefix of the composite (link_id, timestamp) index
+    link_id: int = Field(foreign_key="link.id", description="关联的链接 ID / Associated Link ID")
+    # 中文: utcnow 返回 aware 的 UTC 时间; 索引由复合索引 (timestamp, id) 的前缀覆盖
+    # English: utcnow returns an aware UTC time; indexing is covered by the prefix of the composite (timestamp, id) index
+    timestamp: datetime = Field(default_factory=utcnow, description="事件发生时间 / Event timestamp")
     status: HistoryStatus = Field(description="任务状态 (成功/失败) / Task status (success/failure)")
     # 中文: 存储下载/录制的文件路径列表 (JSON)
     # English: Store list of downloaded/recorded file paths (JSON)
-    downloaded_files: Optional[List[str]] = Field(default=None, sa_column=Column(JSON), description="下载/录制的文件列表 / List of downloaded/recorded files")
+    downloaded_files: Optional[List[str]] = Field(default=None, sa_column=Column(JSONVariant), description="下载/录制的文件列表 / List of downloaded/recorded files")
     error_message: Optional[str] = Field(default=None, description="错误信息 (如果失败) / Error message (if failed)")
-    details: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON), description="其他详细信息 (例如文件大小, 时长等) / Other details (e.g., file size, duration, etc.)")
+    details: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSONVariant), description="其他详细信息 (例如文件大小, 时长等) / Other details (e.g., file size, duration, etc.)")
 
 class HistoryLog(HistoryLogBase, table=True):
     """
@@ -41,6 +46,13 @@ class HistoryLog(HistoryLogBase, table=True):
     """
     id: Optional[int] = Field(default=None, primary_key=True)
 
+    # 中文: 为按时间倒序的游标分页 (可按 link_id 过滤) 提供复合索引
+    # English: Composite indexes backing the time-descending cursor pagination (optionally filtered by link_id)
+    __table_args__ = (
+        Index("ix_historylog_timestamp_id", "timestamp", "id"),
+        Index("ix_historylog_link_id_timestamp", "link_id", "timestamp"),
+    )
+
     # 中文: 定义与 Link 模型的关系 (可选, 用于 ORM 查询)
     # English: Define relationship with Link model (optional, for ORM queries)
     # link: Optional["Link"] = Relationship(back_populates="history_logs") # 需要在 Link 模型中添加 back_populates / Requires adding back_populates in Link model
@@ -50,6 +62,9 @@ class HistoryLogRead(HistoryLogBase):
     中文: 读取历史记录时使用的 Pydantic 模型
     English: Pydantic model used when reading a history log
     """
+    # 中文: 只读的输出模型, 构造后不可修改 / English: Read-only output model, immutable once constructed
+    model_config = ConfigDict(frozen=True)
+
     id: int
     timestamp: datetime # 确保时间戳被正确序列化 / Ensure timestamp is serialized correctly
 
@@ -3,9 +3,11 @@
 
 from sqlmodel import SQLModel, Field, Column
 from typing import Optional, Dict, Any
-from datetime import datetime, timezone # 导入 timezone / Import timezone
+from datetime import datetime
+from pydantic import ConfigDict
+from sqlalchemy import Index, text
 import enum
-from sqlalchemy import JSON # 使用 SQLAlchemy 的 JSON 类型 / Use SQLAlchemy's JSON type
+from .types import JSONVariant, utcnow # JSON 列类型 (PostgreSQL 上为 JSONB) 和时间戳默认值 / JSON column type (JSONB on PostgreSQL) and timestamp default
 
 class LinkType(str, enum.Enum):
     """
@@ -32,8 +34,8 @@ class LinkBase(SQLModel):
     中文: 链接模型的基础字段
     English: Base fields for the Link model
     """
-    url: str = Field(index=True, unique=True, description="链接URL / Link URL")
-    link_type: LinkType = Field(default=LinkType.CREATOR, description="链接类型 / Link type")
+    url: str = Field(index=True, unique=True, max_length=2048, description="链接URL / Link URL")
+    link_type: LinkType = Field(default=LinkType.CREATOR, index=True, description="链接类型 / Link type")
     site_name: Optional[str] = Field(default=None, index=True, description="网站名称 (例如: Twitter, YouTube) / Site name (e.g., Twitter, YouTube)")
     name: Optional[str] = Field(default=None, description="用户指定的名称或自动获取的名称 / User-specified or automatically fetched name")
     description: Optional[str] = Field(default=None, description="用户添加的描述 / User-added description")
@@ -44,13 +46,13 @@ class LinkBase(SQLModel):
     error_message: Optional[str] = Field(default=None, description="错误信息 / Error message")
     # 中文: 存储特定于链接的设置 (例如下载路径模板, 录制质量等)
     # English: Store link-specific settings (e.g., download path template, recording quality, etc.)
-    settings: Dict[str, Any] = Field(default={}, sa_column=Column(JSON), description="特定设置 (JSON) / Specific settings (JSON)")
+    settings: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSONVariant), description="特定设置 (JSON) / Specific settings (JSON)")
     # 中文: 用于传递给下载器的 Cookies 文件路径 (可选)
     # English: Path to the cookies file to pass to the downloader (optional)
     cookies_path: Optional[str] = Field(default=None, description="Cookies 文件路径 / Cookies file path")
     is_enabled: bool = Field(default=True, description="是否启用监控 / Whether monitoring is enabled")
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), description="创建时间 / Creation time")
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), description="最后更新时间 / Last update time")
+    created_at: datetime = Field(default_factory=utcnow, description="创建时间 / Creation time")
+    updated_at: datetime = Field(default_factory=utcnow, description="最后更新时间 / Last update time")
 
 class Link(LinkBase, table=True):
     """
@@ -59,6 +61,17 @@ class Link(LinkBase, table=True):
     """
     id: Optional[int] = Field(default=None, primary_key=True)
 
+    # 中文: 只包含启用链接的部分索引, 供调度器的监控扫描使用 (禁用的链接不占索引空间)
+    # English: Partial index over enabled links only, backing the scheduler's monitoring sweep (disabled links take no index space)
+    __table_args__ = (
+        Index(
+            "ix_link_enabled_status",
+            "status",
+            sqlite_where=text("is_enabled = 1"),
+            postgresql_where=text("is_enabled"),
+        ),
+    )
+
 class LinkCreate(LinkBase):
     """
     中文: 创建链接时使用的 Pydantic 模型 (用于 API 输入验证)
@@ -71,6 +84,9 @@ class LinkRead(LinkBase):
     中文: 读取链接时使用的 Pydantic 模型 (用于 API 输出)
     English: Pydantic model used when reading a link (for API output)
     """
+    # 中文: 只读的输出模型, 构造后不可修改 / English: Read-only output model, immutable once constructed
+    model_config = ConfigDict(frozen=True)
+
     id: int # 读取时必须包含 id / Must include id when reading
 
 class LinkUpdate(SQLModel):
@@ -78,7 +94,7 @@ class LinkUpdate(SQLModel):
     中文: 更新链接时使用的 Pydantic 模型 (所有字段可选)
     English: Pydantic model used when updating a link (all fields optional)
     """
-    url: Optional[str] = None
+    url: Optional[str] = Field(default=None, max_length=2048)
     name: Optional[str] = None
     description: Optional[str] = None
     tags: Optional[str] = None
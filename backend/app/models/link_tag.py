@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+# /usr/bin/env python3
+
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+
+class LinkTag(SQLModel, table=True):
+    """
+    中文: 链接与标签的关联表 (由 Link.tags 的逗号分隔字符串规范化而来), 用于按标签进行索引查询
+    English: Link-tag association table (normalized from the comma-separated Link.tags string), used for indexed tag lookups
+    """
+    link_id: int = Field(foreign_key="link.id", primary_key=True, description="关联的链接 ID / Associated Link ID")
+    tag: str = Field(primary_key=True, description="标签 / Tag")
+
+    # 中文: (tag, link_id) 复合索引, 按标签查找链接时只需索引查找
+    # English: Composite (tag, link_id) index so looking up links by tag is an index seek
+    __table_args__ = (Index("ix_linktag_tag_link_id", "tag", "link_id"),)
@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
 # /usr/bin/env python3
 
-import secrets
+import base64
+import hashlib
+import os
 from sqlmodel import SQLModel, Field
 from typing import Optional
 from datetime import datetime, timedelta, timezone
-from sqlalchemy import Column, DateTime # 导入 Column 和 DateTime / Import Column and DateTime
+from sqlalchemy import Column, DateTime, Index, String, text # 导入 Column, DateTime, Index 和 String / Import Column, DateTime, Index and String
+from sqlalchemy.types import TypeDecorator
 
 from app.core.config import settings # 用于获取令牌过期时间 / To get token expiration time
 
@@ -13,16 +16,44 @@ from app.core.config import settings # 用于获取令牌过期时间 / To get t
 # English: Define default expiration time for password reset tokens (e.g., 1 hour)
 PASSWORD_RESET_TOKEN_EXPIRE_HOURS = 1
 
+# 中文: 过期令牌保留的天数, 超过后由定期清理任务删除
+# English: Days expired tokens are kept before the periodic cleanup job deletes them
+PASSWORD_RESET_TOKEN_RETENTION_DAYS = 7
+
+# 中文: 重置令牌的随机字节数 (与 secrets.token_urlsafe(32) 相同, 256 位熵)
+# English: Number of random bytes in a reset token (same as secrets.token_urlsafe(32), 256 bits of entropy)
+RESET_TOKEN_BYTES = 32
+
+_urlsafe_b64encode = base64.urlsafe_b64encode
+
+class UTCDateTime(TypeDecorator):
+    """
+    中文: 带时区的 DateTime 列类型, 从数据库读取时保证返回 aware (UTC) datetime。
+    English: Timezone-aware DateTime column type that guarantees aware (UTC) datetimes when reading from the database.
+
+    SQLite 不保存时区信息, 读出的值是 naive 的; 在数据库边界统一附加 UTC, 调用方无需每次修复。
+    SQLite doesn't store timezone info, so values come back naive; UTC is attached once at the DB boundary so callers don't need to repair it each time.
+    """
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_result_value(self, value: Optional[datetime], dialect) -> Optional[datetime]:
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
+
 class PasswordResetTokenBase(SQLModel):
     """
     中文: 密码重置令牌的基础字段
     English: Base fields for the PasswordResetToken model
     """
-    token: str = Field(unique=True, index=True, description="重置令牌 / Reset token")
+    # 中文: 只存储令牌的 SHA-256 哈希 (十六进制), 明文令牌只交给用户; 沿用原有的 token 列名, 兼容已有数据库
+    # English: Only the SHA-256 hash (hex) of the token is stored, the plaintext goes to the user only; keeps the original token column name for existing databases
+    token_hash: str = Field(sa_column=Column("token", String(64), unique=True, index=True, nullable=False), description="重置令牌的 SHA-256 哈希 / SHA-256 hash of the reset token")
     user_id: int = Field(foreign_key="user.id", index=True, description="关联的用户 ID / Associated User ID")
     # 中文: 明确指定数据库列类型为带时区的 DateTime
     # English: Explicitly specify the database column type as DateTime with timezone
-    expires_at: datetime = Field(sa_column=Column(DateTime(timezone=True)), description="令牌过期时间 / Token expiration time")
+    expires_at: datetime = Field(sa_column=Column(UTCDateTime()), description="令牌过期时间 / Token expiration time")
     used: bool = Field(default=False, description="令牌是否已被使用 / Whether the token has been used")
 
 class PasswordResetToken(PasswordResetTokenBase, table=True):
@@ -32,6 +63,17 @@ class PasswordResetToken(PasswordResetTokenBase, table=True):
     """
     id: Optional[int] = Field(default=None, primary_key=True)
 
+    # 中文: 部分索引只包含未使用的令牌, 大小随有效令牌数量而不是历史令牌总数增长
+    # English: Partial index covering only unused tokens, so it grows with the number of live tokens rather than every token ever issued
+    __table_args__ = (
+        Index(
+            "ix_prt_live",
+            "expires_at",
+            sqlite_where=text("used = 0"),
+            postgresql_where=text("used = false"),
+        ),
+    )
+
 class PasswordResetTokenCreate(SQLModel):
     """
     中文: 创建密码重置令牌时使用的模型 (只需要 user_id)
@@ -43,8 +85,18 @@ def generate_reset_token() -> str:
     """
     中文: 生成一个安全的随机令牌字符串。
     English: Generate a secure random token string.
+
+    直接调用 os.urandom 和 base64, 输出格式与 secrets.token_urlsafe 相同 (URL 安全, 无填充)。
+    Calls os.urandom and base64 directly; the output format matches secrets.token_urlsafe (URL-safe, unpadded).
+    """
+    return _urlsafe_b64encode(os.urandom(RESET_TOKEN_BYTES)).rstrip(b"=").decode("ascii")
+
+def hash_reset_token(token: str) -> str:
+    """
+    中文: 计算令牌的 SHA-256 哈希 (十六进制), 用于存储和查找。
+    English: Compute the SHA-256 hash (hex) of a token, used for storage and lookup.
     """
-    return secrets.token_urlsafe(32)
+    return hashlib.sha256(token.encode()).hexdigest()
 
 def calculate_expiry_date() -> datetime:
     """
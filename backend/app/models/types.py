@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+# /usr/bin/env python3
+
+from datetime import datetime, timezone
+
+from sqlalchemy import JSON
+from sqlalchemy.dialects.postgresql import JSONB
+
+# 中文: JSON 列类型: PostgreSQL 上使用二进制的 JSONB (读取时无需重新解析, 支持 GIN 索引), 其他数据库 (SQLite) 仍使用 JSON
+# English: JSON column type: binary JSONB on PostgreSQL (no re-parsing on read, GIN-indexable), plain JSON on other databases (SQLite)
+JSONVariant = JSON().with_variant(JSONB(), "postgresql")
+
+def utcnow() -> datetime:
+    """
+    中文: 返回当前 UTC 时间 (aware datetime), 作为时间戳字段的 default_factory。
+    English: Return the current UTC time (aware datetime), used as the default_factory of timestamp fields.
+    """
+    return datetime.now(timezone.utc)
@@ -1,17 +1,20 @@
 # -*- coding: utf-8 -*-
 # /usr/bin/env python3
 
+from pydantic import ConfigDict
 from sqlmodel import SQLModel, Field
 from typing import Optional
-from datetime import datetime, timezone # 导入 timezone / Import timezone
+from datetime import datetime
+
+from .types import utcnow # 时间戳默认值 / Timestamp default
 
 class UserBase(SQLModel):
     """
     中文: 用户模型的基础字段
     English: Base fields for the User model
     """
-    username: str = Field(unique=True, index=True, description="用户名 / Username")
-    email: Optional[str] = Field(default=None, unique=True, index=True, description="邮箱 / Email")
+    username: str = Field(unique=True, index=True, max_length=64, description="用户名 / Username")
+    email: Optional[str] = Field(default=None, unique=True, index=True, max_length=254, description="邮箱 / Email")
     full_name: Optional[str] = Field(default=None, description="全名 / Full name")
     is_active: bool = Field(default=True, description="用户是否激活 / Is the user active")
     is_superuser: bool = Field(default=False, description="是否为超级用户 / Is superuser")
@@ -23,7 +26,7 @@ class User(UserBase, table=True):
     """
     id: Optional[int] = Field(default=None, primary_key=True)
     hashed_password: str = Field(description="哈希后的密码 / Hashed password")
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), description="创建时间 / Creation time")
+    created_at: datetime = Field(default_factory=utcnow, description="创建时间 / Creation time")
 
 class UserCreate(UserBase):
     """
@@ -37,6 +40,9 @@ class UserRead(UserBase):
     中文: 读取用户时使用的 Pydantic 模型 (不包含密码)
     English: Pydantic model used when reading a user (excludes password)
     """
+    # 中文: 只读的输出模型, 构造后不可修改 / English: Read-only output model, immutable once constructed
+    model_config = ConfigDict(frozen=True)
+
     id: int
     created_at: datetime
 
@@ -45,7 +51,7 @@ class UserUpdate(SQLModel):
     中文: 更新用户时使用的 Pydantic 模型 (所有字段可选)
     English: Pydantic model used when updating a user (all fields optional)
     """
-    email: Optional[str] = None
+    email: Optional[str] = Field(default=None, max_length=254)
     full_name: Optional[str] = None
     password: Optional[str] = None # 允许更新密码 / Allow updating password
     is_active: Optional[bool] = None
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # /usr/bin/env python3
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 
 class Token(BaseModel):
@@ -9,6 +9,9 @@ class Token(BaseModel):
     中文: API 返回的令牌模型
     English: Token model returned by the API
     """
+    # 中文: 只读的输出模型, 构造后不可修改 / English: Read-only output model, immutable once constructed
+    model_config = ConfigDict(frozen=True)
+
     access_token: str
     token_type: str = "bearer"
 
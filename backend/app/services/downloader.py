@@ -3,12 +3,14 @@
 
 import yt_dlp
 import gallery_dl
+from gallery_dl import config as gdl_config, job as gdl_job # 进程内调用 gallery-dl / Drive gallery-dl in-process
 import os
+import stat
 import logging
-import re # 正则表达式库, 用于解析 gallery-dl 输出 / Regex library for parsing gallery-dl output
-import asyncio # 用于 subprocess
-import subprocess # 用于 gallery-dl 调用 / For gallery-dl call
-from typing import Dict, Any, Optional, Tuple, List
+import asyncio # 用于在线程中运行下载器 / For running downloaders in worker threads
+import threading
+from functools import cache
+from typing import Callable, Dict, Any, Optional, Tuple, List
 from app.core.config import settings, PROJECT_ROOT # Added PROJECT_ROOT
 from app.models.link import Link, LinkType
 
@@ -38,19 +40,197 @@ YDL_DEFAULT_OPTS = {
     'fragment_retries': 5, # 分片下载重试次数 / Fragment retries
 }
 
-# 中文: 定义 gallery-dl 的默认选项 (通过命令行参数模拟)
-# English: Define default options for gallery-dl (simulated via command-line arguments)
-GDL_DEFAULT_ARGS = [
-    "--directory", settings.MEDIA_ROOT, # 下载目录 / Download directory
-    "--write-metadata", # 写入元数据文件 / Write metadata file
-    "--ugoira-conv-lossless", # ugoira (动图) 转为无损格式 / Convert ugoira (animated images) to lossless format
-    "--retries", "5", # 重试次数 / Number of retries
-    "--sleep", "1-3", # 下载间隔随机睡眠 / Random sleep between downloads
-    "--download-archive", os.path.join(settings.MEDIA_ROOT, 'gallery_dl_archive.sqlite'), # 下载记录数据库 (修正参数名) / Archive database (corrected parameter name)
-    "--concurrent", str(settings.MAX_CONCURRENT_DOWNLOADS), # 并发下载数 / Concurrent downloads
+# 中文: 定义 gallery-dl 的默认选项 ((配置路径, 键, 值), 等同于原先的命令行参数)
+# English: Define default options for gallery-dl ((config path, key, value), equivalent to the former command-line arguments)
+GDL_DEFAULT_CONFIG = [
+    ((), "base-directory", settings.MEDIA_ROOT), # 下载目录 (--directory) / Download directory (--directory)
+    ((), "directory", ()), # 直接下载到 base-directory / Download directly into base-directory
+    ((), "postprocessors", [
+        "metadata", # 写入元数据文件 (--write-metadata) / Write metadata file (--write-metadata)
+        { # ugoira (动图) 转为无损格式 (--ugoira-conv-lossless) / Convert ugoira (animated images) to lossless format (--ugoira-conv-lossless)
+            "name": "ugoira",
+            "extension": "webm",
+            "ffmpeg-args": ("-c:v", "libvpx-vp9", "-lossless", "1", "-pix_fmt", "yuv420p", "-an"),
+            "whitelist": ("pixiv", "danbooru"),
+        },
+    ]),
+    (("extractor",), "ugoira", "original"),
+    (("extractor",), "retries", 5), # 重试次数 / Number of retries
+    (("extractor",), "sleep", "1-3"), # 下载间隔随机睡眠 / Random sleep between downloads
+    (("extractor",), "archive", os.path.join(settings.MEDIA_ROOT, 'gallery_dl_archive.sqlite')), # 下载记录数据库 / Archive database
+    (("output",), "mode", "null"), # 不向服务器的标准输出打印进度 / Don't print progress to the server's stdout
 ]
 
-def get_downloader_for_link(link: Link) -> Tuple[str, Dict[str, Any] | List[str]]:
+@cache
+def _init_gallery_dl_config() -> None:
+    """
+    中文: 将默认选项写入 gallery-dl 的全局配置 (只执行一次)。
+    English: Write the default options into gallery-dl's global config (runs once).
+    """
+    for path, key, value in GDL_DEFAULT_CONFIG:
+        gdl_config.set(path, key, value)
+
+class _RecordingOutput:
+    """
+    中文: 包装 gallery-dl 的输出对象, 记录每个成功写入的文件路径。
+    English: Wraps gallery-dl's output object, recording the path of every successfully written file.
+    """
+    def __init__(self, out, paths: List[str]):
+        self._out = out
+        self._paths = paths
+
+    def success(self, path: str) -> None:
+        self._paths.append(path)
+        self._out.success(path)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._out, name)
+
+class _RecordingDownloadJob(gdl_job.DownloadJob):
+    """
+    中文: 收集已下载文件路径并可使用链接特定 Cookies 的 gallery-dl 下载任务 (子任务继承父任务的设置)。
+    English: gallery-dl download job that collects downloaded file paths and can use link-specific cookies (child jobs inherit the parent's settings).
+    """
+    def __init__(self, url, parent=None, *, cookies_path: Optional[str] = None):
+        gdl_job.DownloadJob.__init__(self, url, parent)
+        if parent is not None:
+            cookies_path = parent.cookies_path
+            self.downloaded_files = parent.downloaded_files
+        else:
+            self.downloaded_files = []
+        self.cookies_path = cookies_path
+        self.out = _RecordingOutput(self.out, self.downloaded_files)
+
+        if cookies_path:
+            # 中文: 只对当前提取器覆盖 cookies 选项, 不修改全局配置, 并发任务互不影响
+            # English: Override the cookies option on this extractor only, leaving the global config untouched so concurrent jobs don't interfere
+            extr = self.extractor
+            extr_config = extr.config
+            extr.config = lambda key, default=None: cookies_path if key == "cookies" else extr_config(key, default)
+
+def _run_gallery_dl(url: str, cookies_path: Optional[str]) -> Tuple[int, List[str]]:
+    """
+    中文: 在当前线程中运行 gallery-dl 下载任务。
+    English: Run a gallery-dl download job in the current thread.
+
+    返回 / Returns:
+        Tuple[int, List[str]]: gallery-dl 的退出状态 (0 为成功) 和已下载的文件路径 / gallery-dl's exit status (0 on success) and the downloaded file paths.
+    """
+    _init_gallery_dl_config()
+    job = _RecordingDownloadJob(url, cookies_path=cookies_path)
+    status = job.run()
+    return status, job.downloaded_files
+
+class _SharedYoutubeDL:
+    """
+    中文: 可复用的 YoutubeDL 实例: 一次只被一个下载使用 (由 lock 保护), 进度钩子按次切换。
+    English: Reusable YoutubeDL instance: used by one download at a time (guarded by lock), with the progress hook swapped per call.
+    """
+    def __init__(self, ydl_opts: Dict[str, Any]):
+        self.lock = threading.Lock()
+        self.hook: Optional[Callable[[Dict[str, Any]], None]] = None
+        self.ydl = yt_dlp.YoutubeDL({**ydl_opts, "progress_hooks": [self._dispatch]})
+
+    def _dispatch(self, d: Dict[str, Any]) -> None:
+        hook = self.hook
+        if hook is not None:
+            hook(d)
+
+# 中文: 共享 YoutubeDL 实例缓存 (选项签名 -> 实例), 每个监控周期开始时重置
+# English: Shared YoutubeDL instance cache (options signature -> instance), reset at the start of each monitoring cycle
+_ydl_cache: Dict[Tuple[Tuple[str, str], ...], _SharedYoutubeDL] = {}
+_ydl_cache_lock = threading.Lock()
+
+def _ydl_opts_key(ydl_opts: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    """
+    中文: 计算选项的可哈希签名 (忽略 progress_hooks)。
+    English: Compute a hashable signature of the options (ignoring progress_hooks).
+    """
+    return tuple(sorted((key, repr(value)) for key, value in ydl_opts.items() if key != "progress_hooks"))
+
+def _get_shared_ydl(ydl_opts: Dict[str, Any]) -> _SharedYoutubeDL:
+    """
+    中文: 获取 (必要时创建) 与选项对应的共享 YoutubeDL 实例。
+    English: Get (creating if needed) the shared YoutubeDL instance for the options.
+    """
+    key = _ydl_opts_key(ydl_opts)
+    with _ydl_cache_lock:
+        shared = _ydl_cache.get(key)
+        if shared is None:
+            shared = _ydl_cache[key] = _SharedYoutubeDL(ydl_opts)
+        return shared
+
+def reset_ydl_cache() -> None:
+    """
+    中文: 清空共享 YoutubeDL 实例缓存 (每个监控周期开始时调用), 使下一轮重新读取下载记录和 Cookies 文件。
+    English: Clear the shared YoutubeDL instance cache (called at the start of each monitoring cycle), so the next cycle re-reads the download archive and cookies files.
+
+    空闲的实例会被关闭 (保存 Cookies); 仍在使用的实例在下载结束后由垃圾回收释放。
+    Idle instances are closed (saving cookies); instances still in use are released by garbage collection once their download finishes.
+    """
+    with _ydl_cache_lock:
+        instances = list(_ydl_cache.values())
+        _ydl_cache.clear()
+    for shared in instances:
+        if shared.lock.acquire(blocking=False):
+            try:
+                shared.ydl.close()
+            except Exception as e:
+                logger.warning(f"Failed to close shared YoutubeDL instance: {e}")
+            finally:
+                shared.lock.release()
+
+def _run_yt_dlp(url: str, ydl_opts: Dict[str, Any], hook: Callable[[Dict[str, Any]], None]) -> None:
+    """
+    中文: 在当前线程中用 yt-dlp 下载 URL。优先复用共享实例; 如果共享实例正被其他下载占用, 则使用一次性实例, 不等待。
+    English: Download a URL with yt-dlp in the current thread. Reuses the shared instance when possible; if it is busy with another download, uses a one-off instance instead of waiting.
+    """
+    shared = _get_shared_ydl(ydl_opts)
+    if shared.lock.acquire(blocking=False):
+        try:
+            shared.hook = hook
+            shared.ydl.download([url])
+        finally:
+            shared.hook = None
+            shared.lock.release()
+    else:
+        with yt_dlp.YoutubeDL({**ydl_opts, "progress_hooks": [hook]}) as ydl:
+            ydl.download([url])
+
+def _is_regular_file(path: str) -> bool:
+    """
+    中文: 用一次 stat 同时判断路径是否存在以及是否为普通文件。
+    English: Check with a single stat whether a path exists and is a regular file.
+    """
+    try:
+        return stat.S_ISREG(os.stat(path).st_mode)
+    except (OSError, ValueError):
+        return False
+
+def _resolve_cookie_path(link: Link, site: str) -> Optional[str]:
+    """
+    中文: 解析链接要使用的 Cookies 文件: 优先使用链接特定的 Cookies, 其次使用站点的全局设置。
+    English: Resolve the cookies file for a link: prefer the link-specific cookies, then the site's global setting.
+
+    返回 / Returns:
+        Optional[str]: Cookies 文件路径, 没有可用文件时返回 None / The cookies file path, or None if no usable file exists.
+    """
+    if link.cookies_path:
+        full_cookie_path = os.path.join(PROJECT_ROOT, USER_COOKIES_BASE_DIR_NAME, link.cookies_path)
+        if _is_regular_file(full_cookie_path):
+            logger.info(f"Using link-specific cookies for link {link.id}: {full_cookie_path}")
+            return full_cookie_path
+        logger.warning(f"Link-specific cookies file specified for link {link.id} as '{link.cookies_path}' (resolved to: {full_cookie_path}) but not found. Checking global settings.")
+
+    global_cookie_path = settings.SITE_COOKIES.get(site)
+    if global_cookie_path:
+        if _is_regular_file(global_cookie_path):
+            logger.info(f"Using global cookies for site '{site}': {global_cookie_path}")
+            return global_cookie_path
+        logger.warning(f"Global cookies file specified for site '{site}' but not found at: {global_cookie_path}")
+    return None
+
+def get_downloader_for_link(link: Link) -> Tuple[str, Dict[str, Any]]:
     """
     中文: 根据链接信息选择合适的下载器及其配置。
     English: Select the appropriate downloader and its configuration based on link information.
@@ -60,36 +240,17 @@ def get_downloader_for_link(link: Link) -> Tuple[str, Dict[str, Any] | List[str]
     """
     site = link.site_name.lower() if link.site_name else ""
     link_type = link.link_type
+    # 中文: 两种下载器使用相同的 Cookies 解析规则, 只解析一次 / English: Both downloaders share the same cookies resolution, so resolve it once
+    cookie_path_to_use = _resolve_cookie_path(link, site)
 
     # 中文: 优先使用 gallery-dl 处理图片站和特定网站
     # English: Prioritize gallery-dl for image sites and specific websites
     if site in ["pixiv", "instagram", "deviantart", "artstation", "weibo", "xiaohongshu"]:
         logger.info(f"Using gallery-dl for site: {site}")
-        gdl_args = GDL_DEFAULT_ARGS[:] # 复制默认参数 / Copy default arguments
-        # 中文: 优先使用链接特定的 Cookies, 其次使用全局设置
-        # English: Prioritize link-specific cookies, then global settings
-        cookie_path_to_use = None
-        if link.cookies_path:
-            full_cookie_path = os.path.join(PROJECT_ROOT, USER_COOKIES_BASE_DIR_NAME, link.cookies_path)
-            if os.path.exists(full_cookie_path):
-                cookie_path_to_use = full_cookie_path
-                logger.info(f"Using link-specific cookies for link {link.id}: {cookie_path_to_use}")
-            else:
-                logger.warning(f"Link-specific cookies file specified for link {link.id} as '{link.cookies_path}' (resolved to: {full_cookie_path}) but not found. Checking global settings.")
-        
-        if not cookie_path_to_use:
-            global_cookie_path = settings.SITE_COOKIES.get(site)
-            if global_cookie_path and os.path.exists(global_cookie_path):
-                cookie_path_to_use = global_cookie_path
-                logger.info(f"Using global cookies for site '{site}': {cookie_path_to_use}")
-            elif global_cookie_path:
-                 logger.warning(f"Global cookies file specified for site '{site}' but not found at: {global_cookie_path}")
-
-        if cookie_path_to_use:
-            gdl_args.extend(["--cookies", cookie_path_to_use])
-
-        # TODO: 可以根据 link.settings 添加特定参数 / TODO: Add specific arguments based on link.settings
-        return "gallery-dl", gdl_args
+        gdl_opts: Dict[str, Any] = {"cookies": cookie_path_to_use}
+
+        # TODO: 可以根据 link.settings 添加特定选项 / TODO: Add specific options based on link.settings
+        return "gallery-dl", gdl_opts
 
     # 中文: 其他情况默认使用 yt-dlp
     # English: Default to yt-dlp for other cases
@@ -103,27 +264,9 @@ def get_downloader_for_link(link: Link) -> Tuple[str, Dict[str, Any] | List[str]
         ydl_opts['live_from_start'] = True # 从头开始录制 / Record from the start
         # 可以在这里添加其他直播相关选项 / Add other live-related options here
 
-    # 中文: 检查 yt-dlp 是否也需要 Cookies (同样优先链接特定, 其次全局)
-    # English: Check if yt-dlp also needs cookies (prioritize link-specific, then global)
-    cookie_path_to_use_ydl = None
-    if link.cookies_path:
-        full_cookie_path_ydl = os.path.join(PROJECT_ROOT, USER_COOKIES_BASE_DIR_NAME, link.cookies_path)
-        if os.path.exists(full_cookie_path_ydl):
-            cookie_path_to_use_ydl = full_cookie_path_ydl
-            logger.info(f"Using link-specific cookies for link {link.id} (yt-dlp): {cookie_path_to_use_ydl}")
-        else:
-            logger.warning(f"Link-specific cookies file specified for link {link.id} (yt-dlp) as '{link.cookies_path}' (resolved to: {full_cookie_path_ydl}) but not found. Checking global settings.")
-
-    if not cookie_path_to_use_ydl:
-        global_cookie_path_ydl = settings.SITE_COOKIES.get(site)
-        if global_cookie_path_ydl and os.path.exists(global_cookie_path_ydl):
-            cookie_path_to_use_ydl = global_cookie_path_ydl
-            logger.info(f"Using global cookies for site '{site}' (yt-dlp): {cookie_path_to_use_ydl}")
-        elif global_cookie_path_ydl:
-            logger.warning(f"Global cookies file specified for site '{site}' (yt-dlp) but not found at: {global_cookie_path_ydl}")
-
-    if cookie_path_to_use_ydl:
-        ydl_opts['cookiefile'] = cookie_path_to_use_ydl
+    # 中文: yt-dlp 同样可能需要 Cookies / English: yt-dlp may need cookies as well
+    if cookie_path_to_use:
+        ydl_opts['cookiefile'] = cookie_path_to_use
 
 
     # TODO: 可以根据 link.settings 覆盖或添加特定选项 / TODO: Override or add specific options based on link.settings
@@ -142,7 +285,8 @@ async def download_media(link: Link) -> Dict[str, Any]:
     """
     downloader_name, config = get_downloader_for_link(link)
     result = {"status": "error", "error": None, "downloaded_files": []}
-    downloaded_files_list = [] # 用于收集文件名的列表 / List to collect filenames
+    # 中文: 用集合收集文件名, 自动去重, 返回时才转换为列表 / English: Collect filenames in a set, deduplicated as they arrive and only turned into a list on return
+    downloaded_files_set: set[str] = set()
 
     try:
         if downloader_name == "yt-dlp":
@@ -163,18 +307,18 @@ async def download_media(link: Link) -> Dict[str, Any]:
                     if filepath:
                         # 确保文件存在且不是临时文件
                         # Ensure file exists and is not a temporary file
-                        if not filepath.endswith(('.part', '.temp', '.ytdl')) and os.path.exists(filepath) and os.path.isfile(filepath):
+                        if not filepath.endswith(('.part', '.temp', '.ytdl')) and _is_regular_file(filepath):
                             logger.debug(f"yt-dlp hook: Detected finished file: {filepath}")
-                            downloaded_files_list.append(filepath)
+                            downloaded_files_set.add(filepath)
                         else:
                             logger.debug(f"yt-dlp hook: Ignoring potential temp file or non-existent file: {filepath}")
                     else:
                          logger.debug(f"yt-dlp hook: No filepath found in finished status dict: {d}")
 
-            # 将钩子添加到选项中 / Add hook to options
+            # 中文: 钩子按次传给 _run_yt_dlp, 不放入选项 (选项用作共享实例的缓存键)
+            # English: The hook is passed to _run_yt_dlp per call rather than put into the options (the options key the shared instance cache)
             # 注意: progress_hooks 也可以用来获取信息, 但 postprocessor_hooks 更适合获取最终文件
             # Note: progress_hooks can also get info, but postprocessor_hooks are better for final files
-            ydl_opts['progress_hooks'] = [ydl_filename_hook] # 使用 progress hook 更通用 / Using progress hook is more general
             # --------------------------
 
             # 中文: 确保输出目录存在 (yt-dlp 通常会自动创建, 但以防万一)
@@ -195,27 +339,27 @@ async def download_media(link: Link) -> Dict[str, Any]:
 
             logger.info(f"Starting yt-dlp download for {link.url}") # 选项可能过长, 不打印 / Options might be too long, don't print
             try:
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    # download() 返回 0 表示成功, 非 0 表示有错误 (但 ignoreerrors=True 时仍可能下载了部分文件)
-                    # download() returns 0 on success, non-zero indicates errors (but with ignoreerrors=True, some files might still be downloaded)
-                    ydl.download([link.url])
-                    # 即使有错误, 我们也认为任务完成, 但状态可能不是 success
-                    # Even with errors, we consider the task finished, but status might not be success
-                    # 最终状态和文件列表由钩子决定 / Final status and file list determined by hooks
-                    # yt-dlp download() returns 0 on success, non-zero indicates errors.
-                    # With ignoreerrors=True, it might return 0 even if some items failed,
-                    # but it will log errors. We rely on the hook for file detection.
-                    # If the hook found files, assume success for the link, otherwise check for errors.
-                    if downloaded_files_list:
-                         result["status"] = "success"
-                         result["downloaded_files"] = list(set(downloaded_files_list)) # Deduplicate
-                         logger.info(f"yt-dlp download finished for {link.url}. Status: success, Files: {len(result['downloaded_files'])}")
-                    else:
-                         # If no files were detected, it might be a real failure or no media was found.
-                         # yt-dlp logs will have more details.
-                         result["error"] = "yt-dlp finished, but no files were detected by the hook. Check logs for details."
-                         result["status"] = "error"
-                         logger.warning(f"yt-dlp download finished for {link.url}. Status: error (no files detected).")
+                # download() 返回 0 表示成功, 非 0 表示有错误 (但 ignoreerrors=True 时仍可能下载了部分文件)
+                # download() returns 0 on success, non-zero indicates errors (but with ignoreerrors=True, some files might still be downloaded)
+                # 中文: 在工作线程中下载, 复用同一组选项的共享 YoutubeDL 实例 / English: Download in a worker thread, reusing the shared YoutubeDL instance for these options
+                await asyncio.to_thread(_run_yt_dlp, link.url, ydl_opts, ydl_filename_hook)
+                # 即使有错误, 我们也认为任务完成, 但状态可能不是 success
+                # Even with errors, we consider the task finished, but status might not be success
+                # 最终状态和文件列表由钩子决定 / Final status and file list determined by hooks
+                # yt-dlp download() returns 0 on success, non-zero indicates errors.
+                # With ignoreerrors=True, it might return 0 even if some items failed,
+                # but it will log errors. We rely on the hook for file detection.
+                # If the hook found files, assume success for the link, otherwise check for errors.
+                if downloaded_files_set:
+                     result["status"] = "success"
+                     result["downloaded_files"] = list(downloaded_files_set)
+                     logger.info(f"yt-dlp download finished for {link.url}. Status: success, Files: {len(result['downloaded_files'])}")
+                else:
+                     # If no files were detected, it might be a real failure or no media was found.
+                     # yt-dlp logs will have more details.
+                     result["error"] = "yt-dlp finished, but no files were detected by the hook. Check logs for details."
+                     result["status"] = "error"
+                     logger.warning(f"yt-dlp download finished for {link.url}. Status: error (no files detected).")
 
 
             except yt_dlp.utils.DownloadError as de:
@@ -224,76 +368,36 @@ async def download_media(link: Link) -> Dict[str, Any]:
                  result["error"] = f"yt-dlp DownloadError: {de}"
                  result["status"] = "error"
                  # Even on error, check if some files were downloaded by the hook
-                 if downloaded_files_list:
-                     result["downloaded_files"] = list(set(downloaded_files_list))
+                 if downloaded_files_set:
+                     result["downloaded_files"] = list(downloaded_files_set)
                      logger.info(f"yt-dlp download finished with error for {link.url}, but some files were detected: {len(result['downloaded_files'])}")
                  else:
                      logger.error(f"yt-dlp download failed for {link.url} with DownloadError.")
 
 
         elif downloader_name == "gallery-dl":
-            gdl_args = config
-            # English: gallery-dl needs the URL as a separate argument
-            # English: gallery-dl needs the URL as a separate argument
-            full_args = gdl_args + [link.url]
-            logger.info(f"Starting gallery-dl download for {link.url} with args: {full_args}")
-            # --- 使用 subprocess 调用 gallery-dl ---
-            # --- Using subprocess to call gallery-dl ---
+            gdl_opts = config
+            logger.info(f"Starting gallery-dl download for {link.url}")
+            # --- 在工作线程中以进程内方式运行 gallery-dl, 文件路径由任务直接记录, 无需解析输出 ---
+            # --- Run gallery-dl in-process in a worker thread; file paths are recorded by the job, no output parsing needed ---
             try:
-                process = await asyncio.create_subprocess_exec(
-                    'gallery-dl', *full_args,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE
-                )
-                stdout_bytes, stderr_bytes = await process.communicate()
-                stdout = stdout_bytes.decode(errors='ignore') # 解码输出 / Decode output
-                stderr = stderr_bytes.decode(errors='ignore')
-
-                # --- 解析 gallery-dl 输出以获取文件名 (改进版) ---
-                # --- Parse gallery-dl output for filenames (improved) ---
-                # 尝试匹配 gallery-dl 输出中指示写入文件的行
-                # Try matching lines indicating file writing in gallery-dl output
-                # 常见格式: '/path/to/file' 或 "[debug] Writing data to '/path/to/file'"
-                # Common formats: '/path/to/file' or "[debug] Writing data to '/path/to/file'"
-                # 正则: 匹配以 MEDIA_ROOT 开头的路径, 可能被引号包围, 忽略行首的日志前缀
-                # Regex: Match paths starting with MEDIA_ROOT, possibly quoted, ignore leading log prefix
-                path_pattern = re.compile(
-                    # 可选的日志前缀 / Optional log prefix
-                    r"^(?:\[[^\]]+\]\s*)*"
-                    # 路径部分, 可能被引号包围 / Path part, possibly quoted
-                    r"(?:Writing data to\s*)?" # 可选的 "Writing data to" / Optional "Writing data to"
-                    r"['\"]?(" + re.escape(settings.MEDIA_ROOT) + r"/[^'\"\s]+)['\"]?"
-                )
-
-                for line in stdout.splitlines():
-                    match = path_pattern.search(line.strip()) # 移除首尾空格 / Remove leading/trailing whitespace
-                    if match:
-                        filepath = match.group(1).strip()
-                        # 再次检查文件是否存在且是文件 / Double-check file existence and type
-                        if os.path.exists(filepath) and os.path.isfile(filepath):
-                            logger.debug(f"gallery-dl parser: Found potential file: {filepath}")
-                            downloaded_files_list.append(filepath)
-                        else:
-                             logger.debug(f"gallery-dl parser: Ignoring non-existent or non-file path: {filepath}")
-
-                # ------------------------------------
+                status, gdl_files = await asyncio.to_thread(_run_gallery_dl, link.url, gdl_opts["cookies"])
+                downloaded_files_set.update(gdl_files)
+                result["downloaded_files"] = list(downloaded_files_set)
 
-                if process.returncode == 0:
+                if status == 0:
                     result["status"] = "success"
-                    result["downloaded_files"] = list(set(downloaded_files_list)) # 去重 / Deduplicate
                     if not result["downloaded_files"]:
-                         logger.warning(f"gallery-dl for {link.url} finished successfully but no files were parsed from output.")
-                    logger.info(f"gallery-dl stdout for {link.url}:\n{stdout[:500]}...") # 只记录部分输出 / Log partial output
+                         logger.warning(f"gallery-dl for {link.url} finished successfully but no new files were downloaded.")
                 else:
-                    result["error"] = f"gallery-dl failed with code {process.returncode}. Stderr: {stderr}"
+                    # 中文: 即使失败, 也保留可能已下载的文件 / English: Even on failure, keep potentially downloaded files
+                    result["error"] = f"gallery-dl failed with status {status}. Check logs for details."
                     result["status"] = "error"
-                    # 即使失败, 也记录可能已下载的文件 / Even on failure, log potentially downloaded files
-                    result["downloaded_files"] = list(set(downloaded_files_list))
-                    logger.error(f"gallery-dl stderr for {link.url}:\n{stderr}")
+                    logger.error(f"gallery-dl failed for {link.url} with status {status}.")
 
-            except FileNotFoundError:
-                 logger.error("gallery-dl command not found. Please ensure gallery-dl is installed and in PATH.")
-                 result["error"] = "gallery-dl command not found."
+            except gallery_dl.exception.NoExtractorError:
+                 logger.error(f"gallery-dl has no extractor for URL: {link.url}")
+                 result["error"] = "gallery-dl does not support this URL."
                  result["status"] = "error"
             except Exception as e:
                  logger.error(f"Error running gallery-dl for {link.url}: {e}", exc_info=True)
@@ -313,8 +417,8 @@ async def download_media(link: Link) -> Dict[str, Any]:
 
     # 确保即使发生意外错误, 也能返回收集到的文件列表
     # Ensure the collected file list is returned even if unexpected errors occur
-    if downloaded_files_list and "downloaded_files" not in result:
-         result["downloaded_files"] = list(set(downloaded_files_list))
+    if downloaded_files_set and not result["downloaded_files"]:
+         result["downloaded_files"] = list(downloaded_files_set)
 
     return result
 
@@ -3,20 +3,27 @@
 
 import asyncio
 import logging
-from sqlmodel import select
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud
-from app.models.link import Link, LinkStatus, LinkType
+from app.models.link import LinkStatus, LinkType
 from app.models.history import HistoryStatus # 导入 HistoryStatus / Import HistoryStatus
-from app.services.downloader import download_media
+from app.services.downloader import download_media, reset_ydl_cache
 from app.db.session import AsyncSessionFactory
 from app.core.config import settings # 修正导入路径 / Correct import path
+from app.utils import link_response_cache, history_response_cache
 
 # 中文: 获取日志记录器 (已在 main.py 中配置)
 # English: Get logger (configured in main.py)
 logger = logging.getLogger(__name__)
 
+def _evict_response_caches(link_id: int) -> None:
+    """
+    中文: 写入链接的最终状态和新的历史记录后, 使该链接的响应缓存和历史记录列表缓存失效。
+    English: Invalidate the link's response cache and the history list cache after writing its final status and a new history log.
+    """
+    link_response_cache.pop(link_id, None)
+    history_response_cache.clear()
+
 async def process_link(link_id: int):
     """
     中文: 处理单个链接的下载或录制任务。
@@ -33,12 +40,17 @@ async def process_link(link_id: int):
             link = await crud.link.get(db=db, id=link_id)
             if not link or not link.is_enabled:
                 logger.warning(f"Link {link_id} not found or disabled. Skipping.")
+                # 中文: 释放触发时占用的状态 / English: Release the status claimed by the trigger
+                if link and link.status == LinkStatus.MONITORING:
+                    await crud.link.update_status(db=db, db_obj=link, status=LinkStatus.IDLE)
+                    link_response_cache.pop(link_id, None)
                 return
 
             # 中文: 更新状态为下载中/录制中 (操作开始, 非成功状态)
             # English: Update status to downloading/recording (operation started, not a success state)
             current_action_status = LinkStatus.DOWNLOADING if link.link_type == LinkType.CREATOR else LinkStatus.RECORDING
             await crud.link.update_status(db=db, db_obj=link, status=current_action_status, is_success=False) # Indicate not a success yet
+            link_response_cache.pop(link_id, None)
             logger.info(f"Link {link_id} status updated to {current_action_status}")
 
             # 中文: 调用下载服务
@@ -51,26 +63,33 @@ async def process_link(link_id: int):
             if download_result["status"] == "success":
                 # 中文: 操作成功, 设置 is_success=True
                 # English: Operation succeeded, set is_success=True
-                await crud.link.update_status(db=db, db_obj=link, status=LinkStatus.IDLE, is_success=True)
+                # 中文: 状态更新和历史记录在同一事务中写入, 只提交一次 / English: Write the status update and history log in one transaction with a single commit
+                await crud.link.update_status(db=db, db_obj=link, status=LinkStatus.IDLE, is_success=True, commit=False)
                 await crud.history_log.create_log(
                     db=db,
                     link_id=link_id,
                     status=HistoryStatus.SUCCESS,
                     downloaded_files=download_result.get("downloaded_files"),
                     # details=... # 可以添加文件大小等信息 / Can add file size etc.
+                    commit=False
                 )
+                await db.commit()
+                _evict_response_caches(link_id)
                 logger.info(f"Link {link_id} processed successfully. Status set to IDLE. History logged.")
             else:
                 error_msg = download_result.get("error", "Unknown download error")
                 # 中文: 操作失败, is_success 默认为 False
                 # English: Operation failed, is_success defaults to False
-                await crud.link.update_status(db=db, db_obj=link, status=LinkStatus.ERROR, error_message=error_msg)
+                await crud.link.update_status(db=db, db_obj=link, status=LinkStatus.ERROR, error_message=error_msg, commit=False)
                 await crud.history_log.create_log(
                     db=db,
                     link_id=link_id,
                     status=HistoryStatus.FAILURE,
-                    error_message=error_msg
+                    error_message=error_msg,
+                    commit=False
                 )
+                await db.commit()
+                _evict_response_caches(link_id)
                 logger.error(f"Link {link_id} processing failed. Status set to ERROR. History logged. Error: {error_msg}")
 
         except Exception as e:
@@ -80,6 +99,8 @@ async def process_link(link_id: int):
             # 中文: 记录处理异常的历史
             # English: Log history for processing exception
             try:
+                # 中文: 丢弃未提交的部分写入 / English: Discard any partially written, uncommitted changes
+                await db.rollback()
                 # 中文: 再次获取 link 对象, 因为之前的会话可能已失效
                 # English: Get the link object again as the previous session might be invalid
                 link_for_status = await crud.link.get(db=db, id=link_id)
@@ -87,13 +108,16 @@ async def process_link(link_id: int):
                     error_msg = f"Processing Exception: {e}"
                     # 中文: 异常导致失败, is_success 默认为 False
                     # English: Exception caused failure, is_success defaults to False
-                    await crud.link.update_status(db=db, db_obj=link_for_status, status=LinkStatus.ERROR, error_message=error_msg)
+                    await crud.link.update_status(db=db, db_obj=link_for_status, status=LinkStatus.ERROR, error_message=error_msg, commit=False)
                     await crud.history_log.create_log(
                         db=db,
                         link_id=link_id,
                         status=HistoryStatus.FAILURE,
-                        error_message=error_msg
+                        error_message=error_msg,
+                        commit=False
                     )
+                    await db.commit()
+                    _evict_response_caches(link_id)
             except Exception as inner_e:
                 logger.error(f"Failed to update link {link_id} status and log history after exception: {inner_e}")
         finally:
@@ -109,38 +133,45 @@ async def trigger_monitoring_job():
     It asynchronously starts the process_link task for each link.
     """
     logger.info("Scheduler triggered: Starting monitoring job for all enabled links...")
-    tasks = []
+    # 中文: 每个周期使用新的共享 YoutubeDL 实例 (重新读取下载记录) / English: Use fresh shared YoutubeDL instances each cycle (re-reading the download archive)
+    reset_ydl_cache()
     # 中文: 使用 Semaphore 限制并发任务数量 / Use Semaphore to limit the number of concurrent tasks
     semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_DOWNLOADS)
+    count = 0
 
-    async with AsyncSessionFactory() as db:
-        # 中文: 获取所有需要处理的链接 (启用状态, 并且当前不是正在处理的状态)
-        # English: Get all links that need processing (enabled and not currently being processed)
-        query = select(Link).where(
-            Link.is_enabled == True,
-            Link.status.notin_([LinkStatus.DOWNLOADING, LinkStatus.RECORDING, LinkStatus.MONITORING])
-        )
-        enabled_links = (await db.execute(query)).scalars().all()
-        if not enabled_links:
-            logger.info("Scheduler job: No enabled and idle links found to process.")
-            return
-
-        count = 0
-        async def process_link_with_semaphore(link_id: int, sem: asyncio.Semaphore):
-            async with sem:
+    async def process_link_with_semaphore(link_id: int, sem: asyncio.Semaphore):
+        async with sem:
+            try:
                 await process_link(link_id)
-
-        for link in enabled_links:
-            # 中文: 创建 asyncio 任务来并发处理链接, 并通过 semaphore 控制并发数
-            # English: Create asyncio tasks to process links concurrently, controlled by the semaphore
-            tasks.append(asyncio.create_task(process_link_with_semaphore(link.id, semaphore)))
-            count += 1
-            logger.info(f"Scheduler job: Created task for link_id: {link.id} ({link.url})")
-
-    if tasks:
-        # 中文: 等待所有创建的 process_link 任务完成
-        # English: Wait for all created process_link tasks to complete
-        await asyncio.gather(*tasks)
+            except Exception as e:
+                # 中文: 单个链接失败不应取消同一任务组中的其他链接 / English: One failing link must not cancel the other links in the task group
+                logger.error(f"Scheduler job: Unhandled error processing link_id {link_id}: {e}", exc_info=True)
+
+    # 中文: 任务组在退出时等待所有任务完成; 任务在逐行读取链接时立即启动, 与查询重叠
+    # English: The task group waits for every task on exit; tasks start as soon as each link row is read, overlapping with the query
+    async with asyncio.TaskGroup() as tg:
+        # 中文: 占用操作会提交事务, 因此使用独立的会话, 不影响正在流式读取的查询
+        # English: Claiming commits, so it uses its own session and doesn't disturb the streamed query
+        async with AsyncSessionFactory() as db, AsyncSessionFactory() as claim_db:
+            # 中文: 获取所有需要处理的链接 (启用状态, 并且当前不是正在处理的状态)
+            # English: Get all links that need processing (enabled and not currently being processed)
+            # 中文: 只需要 id 和 url, 因此只查询所需列, 并以流式方式逐行读取 / English: Only id and url are needed, so select just those columns and read them row by row from a stream
+            async for link in crud.link.iter_enabled_link_ids(db, exclude_busy=True):
+                # 中文: 与手动触发一样, 启动任务前用条件 UPDATE 占用链接; 读取之后已被其他触发占用的链接跳过
+                # English: Like the manual trigger, claim the link with a conditional UPDATE before starting its task; skip links another trigger claimed after the read
+                if not await crud.link.claim_for_processing(db=claim_db, id=link.id):
+                    logger.info(f"Scheduler job: Link {link.id} was claimed by another trigger. Skipping.")
+                    continue
+                link_response_cache.pop(link.id, None)
+                # 中文: 创建 asyncio 任务来并发处理链接, 并通过 semaphore 控制并发数
+                # English: Create asyncio tasks to process links concurrently, controlled by the semaphore
+                tg.create_task(process_link_with_semaphore(link.id, semaphore))
+                count += 1
+                logger.info(f"Scheduler job: Created task for link_id: {link.id} ({link.url})")
+        # 中文: 会话在此关闭, 不会在等待下载期间占用数据库连接
+        # English: The session is closed here, so no DB connection is held while waiting for downloads
+
+    if count:
         logger.info(f"Scheduler job: Finished processing {count} links.")
     else:
-        logger.info("Scheduler job: No tasks were created.")
+        logger.info("Scheduler job: No enabled and idle links found to process.")
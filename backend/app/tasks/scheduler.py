@@ -21,7 +21,8 @@ executors = {
 }
 job_defaults = {
     'coalesce': True, # 如果错过了执行时间, 只执行一次 / Execute only once if missed execution time
-    'max_instances': 1 # 每个 Job 只允许一个实例同时运行 / Allow only one instance per Job to run concurrently
+    'max_instances': 1, # 每个 Job 只允许一个实例同时运行 / Allow only one instance per Job to run concurrently
+    'misfire_grace_time': 60 # 事件循环繁忙导致的延迟在 60 秒内仍会执行 (而不是跳过) / Runs delayed by a busy event loop still fire within 60 seconds (instead of being skipped)
 }
 
 # 中文: 创建并配置 AsyncIOScheduler 实例
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+# /usr/bin/env python3
+
+import logging
+from datetime import timedelta
+
+from app import crud
+from app.db.session import AsyncSessionFactory
+from app.models.password_reset import PASSWORD_RESET_TOKEN_RETENTION_DAYS
+
+# 中文: 获取日志记录器 (已在 main.py 中配置)
+# English: Get logger (configured in main.py)
+logger = logging.getLogger(__name__)
+
+async def purge_expired_reset_tokens_job():
+    """
+    中文: 由调度器调用的作业函数, 删除过期超过保留天数的密码重置令牌, 保持令牌表和部分索引较小。
+    English: Job function called by the scheduler to delete password reset tokens expired beyond the retention period, keeping the token table and its partial index small.
+    """
+    async with AsyncSessionFactory() as db:
+        try:
+            count = await crud.password_reset_token.remove_expired(
+                db, older_than=timedelta(days=PASSWORD_RESET_TOKEN_RETENTION_DAYS)
+            )
+            logger.info(f"Token cleanup job: Deleted {count} expired password reset tokens.")
+        except Exception as e:
+            logger.error(f"Token cleanup job failed: {e}", exc_info=True)
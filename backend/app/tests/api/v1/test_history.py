@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# /usr/bin/env python3
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+import httpx
+
+from app.core.config import settings
+from app.models import HistoryLog, HistoryStatus, Link # 导入相关模型 / Import related models
+from app.tests.conftest import TestSessionFactory # 导入测试数据库会话工厂 / Import test DB session factory
+from app.utils import encode_cursor
+
+# --- 测试用例 / Test Cases ---
+
+@pytest.mark.asyncio
+async def test_read_history_cursor_pagination(client: httpx.AsyncClient, superuser_token_headers: Dict[str, str]) -> None:
+    """测试使用 X-Next-Cursor 游标分页读取历史记录 (包括时间戳相同和微秒为 0 的记录)"""
+    base = datetime(2024, 1, 1, 12, 0, 0, 500000, tzinfo=timezone.utc)
+    timestamps = [
+        base, base, base, # 相同时间戳, 由 id 决定顺序 / Identical timestamps, ordered by id
+        base.replace(microsecond=0) - timedelta(seconds=1), # 第二页的最后一条, 游标时间戳的 isoformat 省略微秒 / Last row of page two, the cursor timestamp's isoformat omits microseconds
+        base - timedelta(seconds=2),
+        base - timedelta(days=1),
+        base - timedelta(days=2),
+    ]
+    async with TestSessionFactory() as db:
+        link = Link(url="https://example.com/history/cursor", name="History Cursor")
+        db.add(link)
+        await db.commit()
+        logs = [HistoryLog(link_id=link.id, status=HistoryStatus.SUCCESS, timestamp=ts) for ts in timestamps]
+        db.add_all(logs)
+        await db.commit()
+        link_id = link.id
+        # 按 (timestamp, id) 倒序的期望顺序 / Expected order by (timestamp, id) descending
+        expected_ids = [log.id for log in sorted(logs, key=lambda log: (log.timestamp, log.id), reverse=True)]
+
+    seen_ids: List[int] = []
+    params = {"limit": 2, "link_id": link_id}
+    while True:
+        response = await client.get(f"{settings.API_V1_STR}/history/", params=params, headers=superuser_token_headers)
+        assert response.status_code == 200
+        page = response.json()
+        seen_ids.extend(log["id"] for log in page)
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if not next_cursor:
+            break
+        assert len(page) == 2
+        params = {"limit": 2, "link_id": link_id, "cursor": next_cursor}
+
+    # 游标分页应按顺序返回每条记录恰好一次 (无重复, 无遗漏) / Cursor pagination should return every log exactly once, in order (no duplicates, no gaps)
+    assert seen_ids == expected_ids
+
+@pytest.mark.asyncio
+async def test_read_history_invalid_cursor(client: httpx.AsyncClient, superuser_token_headers: Dict[str, str]) -> None:
+    """测试无效的分页游标返回 400"""
+    for cursor in ("not-a-cursor", encode_cursor("yesterday", 1), encode_cursor(datetime.now(timezone.utc).isoformat(), "abc")):
+        response = await client.get(f"{settings.API_V1_STR}/history/", params={"cursor": cursor}, headers=superuser_token_headers)
+        assert response.status_code == 400, cursor
@@ -90,6 +90,51 @@ async def test_read_links(client: httpx.AsyncClient, superuser_token_headers: Di
     assert link1["id"] in link_ids
     assert link2["id"] in link_ids
 
+@pytest.mark.asyncio
+async def test_read_links_filter_by_tags(client: httpx.AsyncClient, superuser_token_headers: Dict[str, str]) -> None:
+    """测试按标签过滤链接列表 (包含任意一个)"""
+    link_a = await create_test_link(client, superuser_token_headers, "https://example.com/tag_a", "TagA")
+    link_b = await create_test_link(client, superuser_token_headers, "https://example.com/tag_b", "TagB")
+
+    response = await client.get(f"{settings.API_V1_STR}/links/", params={"tags": "taga, missing"}, headers=superuser_token_headers)
+    assert response.status_code == 200
+    link_ids = [l["id"] for l in response.json()]
+    assert link_a["id"] in link_ids
+    assert link_b["id"] not in link_ids
+
+    # 更新标签后过滤结果应随之变化 / Filter results should follow tag updates
+    response = await client.put(f"{settings.API_V1_STR}/links/{link_b['id']}", json={"tags": "taga"}, headers=superuser_token_headers)
+    assert response.status_code == 200
+    response = await client.get(f"{settings.API_V1_STR}/links/", params={"tags": "taga"}, headers=superuser_token_headers)
+    link_ids = [l["id"] for l in response.json()]
+    assert link_a["id"] in link_ids
+    assert link_b["id"] in link_ids
+
+@pytest.mark.asyncio
+async def test_read_links_cursor_pagination(client: httpx.AsyncClient, superuser_token_headers: Dict[str, str]) -> None:
+    """测试使用 X-Next-Cursor 游标分页读取链接列表"""
+    for i in range(3):
+        await create_test_link(client, superuser_token_headers, f"https://example.com/cursor_{i}", f"Cursor {i}")
+
+    seen_ids: List[int] = []
+    params = {"limit": 2}
+    while True:
+        response = await client.get(f"{settings.API_V1_STR}/links/", params=params, headers=superuser_token_headers)
+        assert response.status_code == 200
+        seen_ids.extend(l["id"] for l in response.json())
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if not next_cursor:
+            break
+        params = {"limit": 2, "cursor": next_cursor}
+
+    # 游标分页应按 id 升序返回所有链接且不重复 / Cursor pagination should return every link once, ordered by id
+    assert seen_ids == sorted(set(seen_ids))
+    response = await client.get(f"{settings.API_V1_STR}/links/", params={"limit": 1000}, headers=superuser_token_headers)
+    assert seen_ids == [l["id"] for l in response.json()]
+
+    response = await client.get(f"{settings.API_V1_STR}/links/", params={"cursor": "not-a-cursor"}, headers=superuser_token_headers)
+    assert response.status_code == 400
+
 @pytest.mark.asyncio
 async def test_read_link(client: httpx.AsyncClient, superuser_token_headers: Dict[str, str]) -> None:
     """测试读取单个链接"""
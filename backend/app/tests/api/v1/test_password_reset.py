@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+# /usr/bin/env python3
+
+import pytest
+import httpx
+from sqlalchemy import select
+
+from app import crud
+from app.core import security
+from app.core.config import settings
+from app.models import PasswordResetToken, UserCreate # 导入相关模型 / Import related models
+from app.models.password_reset import hash_reset_token
+from app.tests.conftest import TestSessionFactory # 导入测试数据库会话工厂 / Import test DB session factory
+
+# --- 测试用例 / Test Cases ---
+
+@pytest.mark.asyncio
+async def test_reset_password_token_is_single_use(client: httpx.AsyncClient) -> None:
+    """测试重置令牌只存储哈希、只能使用一次, 且新密码可以登录"""
+    username = "reset_user"
+    old_password = "oldpassword"
+    new_password = "newpassword123"
+    async with TestSessionFactory() as db:
+        await crud.user.create(db, obj_in=UserCreate(username=username, password=old_password))
+
+    # 中文: 生成重置令牌 / English: Generate a reset token
+    r = await client.post(f"{settings.API_V1_STR}/password-recovery/{username}")
+    assert r.status_code == 201
+    reset_token = r.json()["reset_token"]
+
+    # 中文: 数据库中只保存令牌的哈希, 不保存明文 / English: Only the token's hash is stored in the database, never the plaintext
+    async with TestSessionFactory() as db:
+        stored_hashes = (await db.execute(select(PasswordResetToken.token_hash))).scalars().all()
+    assert hash_reset_token(reset_token) in stored_hashes
+    assert reset_token not in stored_hashes
+
+    # 中文: 第一次重置成功 / English: The first reset succeeds
+    body = {"token": reset_token, "new_password": new_password}
+    r = await client.post(f"{settings.API_V1_STR}/reset-password/", json=body)
+    assert r.status_code == 200
+
+    # 中文: 重放同一令牌失败 / English: Replaying the same token fails
+    r = await client.post(f"{settings.API_V1_STR}/reset-password/", json={"token": reset_token, "new_password": "anotherpassword"})
+    assert r.status_code == 400
+
+    # 中文: 新密码可以登录, 旧密码不行 / English: The new password logs in, the old one doesn't
+    r = await client.post(f"{settings.API_V1_STR}/login/access-token", data={"username": username, "password": new_password})
+    assert r.status_code == 200
+    assert "access_token" in r.json()
+    r = await client.post(f"{settings.API_V1_STR}/login/access-token", data={"username": username, "password": old_password})
+    assert r.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_reset_password_rejects_invalid_token_before_hashing(client: httpx.AsyncClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """测试无效令牌在计算密码哈希之前就被拒绝"""
+    async def fail_hash(password: str) -> str:
+        raise AssertionError("password hashed for an invalid token")
+
+    monkeypatch.setattr(security, "get_password_hash_async", fail_hash)
+    r = await client.post(f"{settings.API_V1_STR}/reset-password/", json={"token": "not-a-token", "new_password": "newpassword123"})
+    assert r.status_code == 400
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+# /usr/bin/env python3
+
+import asyncio
+from typing import Dict, List
+
+import pytest
+
+from app.core import async_env_writer
+
+# --- 辅助 Fixture / Helper Fixture ---
+
+@pytest.fixture
+def recorded_writes(monkeypatch: pytest.MonkeyPatch) -> List[Dict[str, str]]:
+    """替换真实的 .env 写入, 记录每次写入的键值批次 / Replace the real .env write and record each written batch"""
+    writes: List[Dict[str, str]] = []
+    monkeypatch.setattr(async_env_writer, "_write_env", lambda updates: writes.append(dict(updates)))
+    monkeypatch.setattr(async_env_writer, "_pending", {})
+    monkeypatch.setattr(async_env_writer, "_wakeup", asyncio.Event())
+    monkeypatch.setattr(async_env_writer, "_writer_task", None)
+    return writes
+
+# --- 测试用例 / Test Cases ---
+
+@pytest.mark.asyncio
+async def test_queued_updates_coalesce_into_one_write(recorded_writes: List[Dict[str, str]], monkeypatch: pytest.MonkeyPatch) -> None:
+    """测试后台写入任务运行时, 防抖间隔内的多次更新合并为一次写入"""
+    monkeypatch.setattr(async_env_writer, "ENV_WRITE_DEBOUNCE_SECONDS", 0.05)
+    async_env_writer.start_env_writer()
+    try:
+        await async_env_writer.queue_env_update("SITE_COOKIES_JSON", '{"a":"1"}')
+        await async_env_writer.queue_env_update("SITE_COOKIES_JSON", '{"a":"2"}')
+        await async_env_writer.queue_env_update("OTHER_KEY", "x")
+        assert recorded_writes == [] # 尚未到防抖间隔 / Debounce interval not elapsed yet
+
+        await asyncio.sleep(0.2)
+        assert recorded_writes == [{"SITE_COOKIES_JSON": '{"a":"2"}', "OTHER_KEY": "x"}]
+    finally:
+        await async_env_writer.stop_env_writer()
+    assert recorded_writes == [{"SITE_COOKIES_JSON": '{"a":"2"}', "OTHER_KEY": "x"}] # 关闭时没有剩余写入 / Nothing left to write on shutdown
+
+@pytest.mark.asyncio
+async def test_update_written_immediately_without_writer_task(recorded_writes: List[Dict[str, str]]) -> None:
+    """测试后台写入任务未运行时, 更新立即写入"""
+    await async_env_writer.queue_env_update("SITE_COOKIES_JSON", '{"a":"1"}')
+    assert recorded_writes == [{"SITE_COOKIES_JSON": '{"a":"1"}'}]
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# /usr/bin/env python3
+
+from typing import Dict
+
+import pytest
+
+from app import crud
+from app.models.link import Link, LinkCreate, LinkStatus
+from app.tasks import link_monitor
+from app.utils import link_response_cache, history_response_cache
+from app.tests.conftest import TestSessionFactory # 导入测试数据库会话工厂 / Import test DB session factory
+
+# --- 测试用例 / Test Cases ---
+
+@pytest.mark.asyncio
+async def test_monitoring_job_claims_links_before_processing(monkeypatch: pytest.MonkeyPatch) -> None:
+    """测试定时扫描在启动任务前占用链接, 并跳过已被其他触发占用的链接"""
+    async with TestSessionFactory() as db:
+        claimed_link = await crud.link.create(db, obj_in=LinkCreate(url="https://example.com/sweep-claimed"))
+        raced_link = await crud.link.create(db, obj_in=LinkCreate(url="https://example.com/sweep-raced"))
+    claimed_id, raced_id = claimed_link.id, raced_link.id
+
+    original_claim = crud.link.claim_for_processing
+
+    async def claim_after_manual_trigger(db, *, id: int) -> bool:
+        # 中文: 模拟扫描读取之后、占用之前发生的手动触发 / English: Simulate a manual trigger landing between the sweep's read and its claim
+        if id == raced_id:
+            async with TestSessionFactory() as trigger_db:
+                assert await original_claim(trigger_db, id=id)
+        return await original_claim(db, id=id)
+
+    statuses_seen: Dict[int, LinkStatus] = {}
+
+    async def fake_process_link(link_id: int) -> None:
+        async with TestSessionFactory() as db:
+            link = await db.get(Link, link_id)
+            statuses_seen[link_id] = link.status
+            await crud.link.update_status(db=db, db_obj=link, status=LinkStatus.IDLE)
+
+    monkeypatch.setattr(link_monitor, "AsyncSessionFactory", TestSessionFactory)
+    monkeypatch.setattr(link_monitor, "process_link", fake_process_link)
+    monkeypatch.setattr(crud.link, "claim_for_processing", claim_after_manual_trigger)
+
+    await link_monitor.trigger_monitoring_job()
+
+    # 中文: 扫描占用的链接在处理时已是 MONITORING; 被抢先占用的链接不会被扫描再次处理
+    # English: A link the sweep claimed is already MONITORING when processed; a link claimed first by another trigger isn't processed again
+    assert statuses_seen[claimed_id] == LinkStatus.MONITORING
+    assert raced_id not in statuses_seen
+
+
+@pytest.mark.asyncio
+async def test_process_link_evicts_response_caches(monkeypatch: pytest.MonkeyPatch) -> None:
+    """测试处理任务写入最终状态和历史记录后使响应缓存失效"""
+    async with TestSessionFactory() as db:
+        link = await crud.link.create(db, obj_in=LinkCreate(url="https://example.com/process-evicts"))
+    link_id = link.id
+
+    async def fake_download_media(link: Link) -> dict:
+        return {"status": "success", "downloaded_files": []}
+
+    monkeypatch.setattr(link_monitor, "AsyncSessionFactory", TestSessionFactory)
+    monkeypatch.setattr(link_monitor, "download_media", fake_download_media)
+    link_response_cache[link_id] = b"stale"
+    history_response_cache["stale"] = (b"[]", {})
+
+    await link_monitor.process_link(link_id)
+
+    assert link_id not in link_response_cache
+    assert "stale" not in history_response_cache
@@ -3,5 +3,7 @@
 
 # 中文: 导入工具函数, 使其可以直接从 app.utils 导入
 # English: Import utility functions so they can be imported directly from app.utils
-from .link_utils import extract_site_name
-from .db_utils import export_database_to_sql, import_database_from_sql
+from .link_utils import extract_site_name, split_tags
+from .db_utils import export_database_to_sql, import_database_from_sql, stream_database_dump
+from .pagination import encode_cursor, decode_cursor, NEXT_CURSOR_HEADER
+from .response_cache import link_response_cache, history_response_cache, cookies_response_cache
@@ -6,6 +6,7 @@ import logging
 import os
 import shutil
 from datetime import datetime
+from typing import AsyncIterator, Optional
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -69,6 +70,60 @@ async def export_database_to_sql(output_filename: str) -> bool:
             os.remove(output_filename)
         return False
 
+async def stream_database_dump(chunk_size: int = 64 * 1024) -> Optional[AsyncIterator[bytes]]:
+    """
+    中文: 启动 sqlite3 .dump 并返回其标准输出的异步分块迭代器, 无需经过临时文件。
+    English: Start sqlite3 .dump and return an async iterator over its stdout chunks, without a temporary file.
+
+    进程在返回前启动, 因此数据库或 sqlite3 缺失时可以在开始响应之前报告失败。
+    The process is started before returning, so a missing database or sqlite3 binary is reported before a response starts.
+
+    参数 / Parameters:
+        chunk_size: 每次从管道读取的最大字节数 / Maximum number of bytes read from the pipe at a time.
+
+    返回 / Returns:
+        Optional[AsyncIterator[bytes]]: SQL 内容的分块迭代器, 失败时为 None / Iterator over SQL chunks, or None on failure.
+    """
+    db_path = settings.DATABASE_URL.replace("sqlite+aiosqlite:///", "")
+    if not os.path.exists(db_path):
+        logger.error(f"Database file not found at: {db_path}")
+        return None
+
+    sqlite3_cmd = shutil.which("sqlite3")
+    if not sqlite3_cmd:
+        logger.error("sqlite3 command not found. Please install SQLite command-line tools.")
+        return None
+
+    try:
+        process = await asyncio.create_subprocess_exec(
+            sqlite3_cmd, db_path, ".dump",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+    except Exception as e:
+        logger.error(f"Exception while starting database export: {e}", exc_info=True)
+        return None
+
+    async def iterate_dump() -> AsyncIterator[bytes]:
+        try:
+            while chunk := await process.stdout.read(chunk_size):
+                yield chunk
+            stderr = await process.stderr.read()
+            await process.wait()
+            if process.returncode == 0:
+                logger.info("Database successfully streamed as SQL dump.")
+            else:
+                error_message = stderr.decode().strip() if stderr else "Unknown error"
+                logger.error(f"Database export failed. Return code: {process.returncode}. Error: {error_message}")
+        finally:
+            # 中文: 客户端中途断开时终止子进程
+            # English: Terminate the subprocess if the client disconnects mid-stream
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+
+    return iterate_dump()
+
 async def import_database_from_sql(sql_filepath: str) -> bool:
     """
     中文: 从 SQL 文件导入数据到 SQLite 数据库。
@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 # /usr/bin/env python3
 
-from urllib.parse import urlparse
-from typing import Optional
+from functools import lru_cache
+from urllib.parse import urlsplit
+from typing import List, Optional
 
 # 中文: 定义一些已知网站的域名映射, 用于更精确地识别网站名称
 # English: Define domain mappings for some known websites for more accurate site name identification
@@ -45,55 +46,76 @@ def extract_site_name(url: str) -> Optional[str]:
     - http://localhost:8000 -> localhost
     """
     try:
-        parsed_url = urlparse(url)
-        netloc = parsed_url.netloc.lower() # 获取域名部分并转小写 / Get the domain part and convert to lowercase
+        # 中文: 结果只取决于主机名, 因此按主机名缓存
+        # English: The result only depends on the host name, so cache on it
+        netloc = urlsplit(url).netloc.lower() # 获取域名部分并转小写 / Get the domain part and convert to lowercase
+    except Exception:
+        # 中文: 解析 URL 时发生任何错误, 都返回 None
+        # English: Return None if any error occurs during URL parsing
+        return None
 
-        if not netloc:
-            return None
+    if not netloc:
+        return None
+
+    # 中文: 移除端口号 (如果存在)
+    # English: Remove port number (if exists)
+    if ':' in netloc:
+        netloc = netloc.split(':')[0]
 
-        # 中文: 移除端口号 (如果存在)
-        # English: Remove port number (if exists)
-        if ':' in netloc:
-            netloc = netloc.split(':')[0]
+    return _site_name_for_host(netloc)
 
-        # 中文: 优先匹配已知站点
-        # English: Prioritize matching known sites
-        for domain, name in KNOWN_SITES.items():
-            if netloc.endswith(domain):
-                return name
+@lru_cache(maxsize=4096)
+def _site_name_for_host(netloc: str) -> Optional[str]:
+    """
+    中文: 根据 (小写、无端口的) 主机名推断网站名称, 结果会被缓存。
+    English: Infer the site name from a (lowercase, port-less) host name; results are cached.
+    """
+    # 中文: 优先匹配已知站点
+    # English: Prioritize matching known sites
+    for domain, name in KNOWN_SITES.items():
+        if netloc.endswith(domain):
+            return name
 
-        # 中文: 如果不在已知站点中, 尝试提取主域名部分
-        # English: If not in known sites, try to extract the main domain part
-        parts = netloc.split('.')
-        if len(parts) >= 2:
-            # 中文: 移除常见的 www. 前缀
-            # English: Remove common www. prefix
-            if parts[0] == 'www':
-                parts = parts[1:]
+    # 中文: 如果不在已知站点中, 尝试提取主域名部分
+    # English: If not in known sites, try to extract the main domain part
+    parts = netloc.split('.')
+    if len(parts) >= 2:
+        # 中文: 移除常见的 www. 前缀
+        # English: Remove common www. prefix
+        if parts[0] == 'www':
+            parts = parts[1:]
 
-            # 中文: 处理类似 .co.uk 的情况, 取倒数第二个部分
-            # English: Handle cases like .co.uk, take the second to last part
-            if len(parts) >= 2 and len(parts[-1]) <= 3 and len(parts[-2]) <= 3:
-                 # 假设是 .co.uk, .org.cn 等 / Assume .co.uk, .org.cn etc.
-                 if len(parts) >= 3:
-                     return parts[-3].capitalize()
-                 else: # 无法确定主域名 / Cannot determine main domain
-                     return parts[0].capitalize() # 返回第一部分 / Return the first part
-            else:
-                # 中文: 取倒数第二个部分作为网站名 (例如 google.com -> Google)
-                # English: Take the second to last part as the site name (e.g., google.com -> Google)
-                return parts[-2].capitalize()
-        elif len(parts) == 1:
-             # 中文: 可能是 localhost 或类似情况
-             # English: Might be localhost or similar cases
-             return parts[0]
+        # 中文: 处理类似 .co.uk 的情况, 取倒数第二个部分
+        # English: Handle cases like .co.uk, take the second to last part
+        if len(parts) >= 2 and len(parts[-1]) <= 3 and len(parts[-2]) <= 3:
+             # 假设是 .co.uk, .org.cn 等 / Assume .co.uk, .org.cn etc.
+             if len(parts) >= 3:
+                 return parts[-3].capitalize()
+             else: # 无法确定主域名 / Cannot determine main domain
+                 return parts[0].capitalize() # 返回第一部分 / Return the first part
         else:
-            return None # 无法解析 / Cannot parse
+            # 中文: 取倒数第二个部分作为网站名 (例如 google.com -> Google)
+            # English: Take the second to last part as the site name (e.g., google.com -> Google)
+            return parts[-2].capitalize()
+    elif len(parts) == 1:
+         # 中文: 可能是 localhost 或类似情况
+         # English: Might be localhost or similar cases
+         return parts[0]
+    else:
+        return None # 无法解析 / Cannot parse
 
-    except Exception:
-        # 中文: 解析 URL 时发生任何错误, 都返回 None
-        # English: Return None if any error occurs during URL parsing
-        return None
+def split_tags(tags: Optional[str]) -> List[str]:
+    """
+    中文: 将逗号分隔的标签字符串拆分为去重后的标签列表 (去除空白和空标签)。
+    English: Split a comma-separated tag string into a de-duplicated list of tags (whitespace and empty tags removed).
+
+    例如 / Example:
+    - "music, live,,music" -> ["music", "live"]
+    """
+    if not tags:
+        return []
+    # 中文: dict.fromkeys 保留首次出现的顺序 / English: dict.fromkeys keeps first-seen order
+    return list(dict.fromkeys(tag for tag in (t.strip() for t in tags.split(',')) if tag))
 
 if __name__ == "__main__":
     # 中文: 测试函数
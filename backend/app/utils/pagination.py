@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+# /usr/bin/env python3
+
+import base64
+from typing import Any, List
+
+# 中文: 下一页游标所在的响应头名称
+# English: Name of the response header carrying the next-page cursor
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(*parts: Any) -> str:
+    """
+    中文: 将排序键 (例如最后一行的 timestamp 和 id) 编码为不透明的 URL 安全游标。
+    English: Encode sort keys (e.g. the last row's timestamp and id) into an opaque URL-safe cursor.
+    """
+    raw = "|".join(str(part) for part in parts)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> List[str]:
+    """
+    中文: 解码由 encode_cursor 生成的游标, 返回各排序键的字符串形式。
+    English: Decode a cursor produced by encode_cursor, returning the sort keys as strings.
+
+    异常 / Raises:
+        ValueError: 游标格式无效 / The cursor is malformed.
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return base64.urlsafe_b64decode(padded.encode()).decode().split("|")
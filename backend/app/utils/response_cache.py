@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+# /usr/bin/env python3
+
+from cachetools import TTLCache
+
+# 中文: 单个链接的 JSON 响应缓存 (链接 ID -> JSON 字节), 在更新/删除/触发以及处理任务写入状态时失效
+# English: JSON response cache for single links (link ID -> JSON bytes), invalidated on update/delete/trigger and when link processing writes a status
+link_response_cache: TTLCache = TTLCache(maxsize=1_024, ttl=10)
+
+# 中文: 历史记录列表的响应缓存 (查询参数 -> (JSON 字节, 响应头)), 删除历史记录或处理任务写入新记录时清空
+# English: History list response cache (query parameters -> (JSON bytes, headers)), cleared when history logs are deleted or link processing writes a new one
+history_response_cache: TTLCache = TTLCache(maxsize=256, ttl=5)
+
+# 中文: 全局站点 Cookies 配置的 JSON 响应缓存 (与用户无关, 单个条目), 更新配置时清空
+# English: JSON response cache for the global site cookies configuration (user-independent, single entry), cleared when the configuration is updated
+cookies_response_cache: TTLCache = TTLCache(maxsize=1, ttl=300)
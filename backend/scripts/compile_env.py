@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# /usr/bin/env python3
+
+"""
+中文: 在构建/部署时将 .env 文件预先解析为 Python 模块 (app/core/_env_compiled.py), 启动时无需再解析 .env。
+English: Pre-parse the .env file into a Python module (app/core/_env_compiled.py) at build/deploy time, so startup doesn't need to parse .env.
+
+用法 / Usage (在 backend 目录下运行 / run from the backend directory):
+    python scripts/compile_env.py [path/to/.env]
+
+修改 .env 后需要重新运行, 或删除生成的模块以回退到直接读取 .env。
+Re-run after changing .env, or delete the generated module to fall back to reading .env directly.
+
+注意: 应用运行时写回 .env 的键 (app.core.config.RUNTIME_ENV_KEYS, 例如 PUT /settings/cookies 保存的 SITE_COOKIES_JSON)
+即使存在生成的模块, 启动时也始终从 .env 读取, 因此运行时的修改在重启后不会回退到这里编译的值。
+Note: keys the application writes back to .env at runtime (app.core.config.RUNTIME_ENV_KEYS, e.g. SITE_COOKIES_JSON saved by PUT /settings/cookies)
+are always read from .env at startup even when the generated module exists, so runtime changes are not reverted to the values compiled here after a restart.
+"""
+
+import os
+import sys
+
+from dotenv import dotenv_values
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_ENV_PATH = os.path.join(BACKEND_DIR, ".env")
+OUTPUT_PATH = os.path.join(BACKEND_DIR, "app", "core", "_env_compiled.py")
+
+def compile_env(env_path: str, output_path: str) -> int:
+    """
+    中文: 读取 .env 文件并写出包含 ENV 字典字面量的 Python 模块。
+    English: Read the .env file and write a Python module containing an ENV dict literal.
+
+    返回 / Returns:
+        int: 写入的变量数量 / The number of variables written.
+    """
+    values = {key: value for key, value in dotenv_values(env_path).items() if value is not None}
+    lines = [
+        "# -*- coding: utf-8 -*-",
+        "# 由 scripts/compile_env.py 生成, 请勿手动修改 / Generated by scripts/compile_env.py, do not edit",
+        "",
+        "ENV = {",
+    ]
+    lines.extend(f"    {key!r}: {value!r}," for key, value in sorted(values.items()))
+    lines.append("}")
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return len(values)
+
+if __name__ == "__main__":
+    env_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ENV_PATH
+    if not os.path.isfile(env_path):
+        print(f".env file not found: {env_path}")
+        sys.exit(1)
+    count = compile_env(env_path, OUTPUT_PATH)
+    print(f"Compiled {count} variables from {env_path} into {OUTPUT_PATH}")